@@ -0,0 +1,32 @@
+"""Choice matching of key sets."""
+from xmodels.models import Choice, SequenceElement
+
+
+class MatchChoiceKeys(object):
+    params = [2, 8, 32]
+    param_names = ['options']
+
+    def setup(self, options):
+        self.choice = Choice(options=[
+            [SequenceElement('required%d' % index, min_occurs=1),
+             SequenceElement('optional%d' % index)]
+            for index in range(options)])
+        self.key_sets = [set(['required%d' % index, 'optional%d' % index])
+                         for index in range(options)]
+
+    def match(self):
+        match = self.choice.match_choice_keys
+        for key_set in self.key_sets:
+            match(key_set, errors=[])
+
+    def time_match(self, options):
+        self.match()
+
+    def peakmem_match(self, options):
+        self.match()
+
+    def time_no_match(self, options):
+        self.choice.match_choice_keys(set(['optional0']), errors=[])
+
+    def peakmem_no_match(self, options):
+        self.choice.match_choice_keys(set(['optional0']), errors=[])
@@ -0,0 +1,36 @@
+"""Matching of ID/IDREF and key/keyref identity constraints."""
+from xmodels import constraints
+
+
+class MatchRefs(object):
+    params = [100, 1000, 5000]
+    param_names = ['keys']
+
+    def setup(self, keys):
+        self.stores = stores = constraints.Stores()
+        id_field = constraints.ID()
+        idref_field = constraints.IDREF()
+        constraints.InitKeyStore('name').add_keys(path='root',
+                                                  stores=stores)
+        key_field = constraints.CheckKeys(key_names='name', level=1)
+        for index in range(keys):
+            id_field.validate('id%d' % index, stores=stores,
+                              path='root.item[%d].id' % index)
+            idref_field.validate('id%d' % (keys - 1 - index), stores=stores,
+                                 path='root.ref[%d].idref' % index)
+            key_field.validate('key%d' % index, stores=stores,
+                               path='root.key%d' % index)
+            stores.refStore.add_key_ref('name', 'key%d' % (keys - 1 - index),
+                                        'root.keyref[%d]' % index)
+
+    def match_refs(self):
+        # match_refs records every target once
+        self.stores.refStore.targets = {}
+        self.stores.idrefStore.targets = {}
+        constraints.match_refs(self.stores)
+
+    def time_match_refs(self, keys):
+        self.match_refs()
+
+    def peakmem_match_refs(self, keys):
+        self.match_refs()
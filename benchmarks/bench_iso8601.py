@@ -0,0 +1,57 @@
+"""Parsing of date and time values."""
+from xmodels import DateField, DateTimeField, TimeField
+from xmodels.iso8601 import parse
+
+VALUES = 1000
+
+
+def _parse(values):
+    for value in values:
+        parse(value)
+
+
+def _deserialize(field, values):
+    deserialize = field.deserialize
+    for value in values:
+        deserialize(value)
+
+
+class Parse(object):
+
+    def setup(self):
+        self.date_times = ['2014-%02d-%02dT%02d:%02d:%02d' % (
+            index % 12 + 1, index % 28 + 1, index % 24, index % 60,
+            index % 59) for index in range(VALUES)]
+        self.zoned = [value + '+05:30' for value in self.date_times]
+        self.dates = [value[:10] for value in self.date_times]
+        self.times = [value[11:] for value in self.date_times]
+
+    def time_parse(self):
+        _parse(self.date_times)
+
+    def peakmem_parse(self):
+        _parse(self.date_times)
+
+    def time_parse_time_zone(self):
+        _parse(self.zoned)
+
+    def peakmem_parse_time_zone(self):
+        _parse(self.zoned)
+
+    def time_date_time_field(self):
+        _deserialize(DateTimeField(), self.date_times)
+
+    def peakmem_date_time_field(self):
+        _deserialize(DateTimeField(), self.date_times)
+
+    def time_date_field(self):
+        _deserialize(DateField(), self.dates)
+
+    def peakmem_date_field(self):
+        _deserialize(DateField(), self.dates)
+
+    def time_time_field(self):
+        _deserialize(TimeField(), self.times)
+
+    def peakmem_time_field(self):
+        _deserialize(TimeField(), self.times)
@@ -0,0 +1,30 @@
+"""Ingest of JUnit XML reports with xmodels.schemata.junit."""
+from xmodels.schemata.junit import TestSuites
+
+from .data import copy_root, junit_report
+
+
+class Ingest(object):
+    params = [10, 100, 1000]
+    param_names = ['cases']
+
+    def setup(self, cases):
+        self.report = junit_report(10, cases)
+
+    def ingest(self):
+        instance = TestSuites()
+        instance.from_xml(copy_root(self.report))
+        instance.validate(errors=[])
+        return instance
+
+    def time_ingest(self, cases):
+        self.ingest()
+
+    def peakmem_ingest(self, cases):
+        self.ingest()
+
+    def time_ingest_serialize(self, cases):
+        self.ingest().serialize()
+
+    def peakmem_ingest_serialize(self, cases):
+        self.ingest().serialize()
@@ -0,0 +1,74 @@
+"""Populate, validate, load and serialize of scaled abstractDefinition
+documents."""
+from xmodels import Model
+
+from .data import AbstractDefinition, abstract_definition, copy_root, \
+    name_spaces, root_data
+
+
+class FromDict(object):
+    params = [10, 100, 1000]
+    param_names = ['ports']
+
+    def setup(self, ports):
+        self.raw = root_data(abstract_definition(ports))
+
+    def time_from_dict(self, ports):
+        AbstractDefinition.from_dict(self.raw, name_spaces=name_spaces,
+                                     errors=[])
+
+    def peakmem_from_dict(self, ports):
+        AbstractDefinition.from_dict(self.raw, name_spaces=name_spaces,
+                                     errors=[])
+
+
+class Load(object):
+    params = [10, 100, 1000]
+    param_names = ['ports']
+
+    def setup(self, ports):
+        if not hasattr(Model, 'load'):
+            raise NotImplementedError
+        self.raw = root_data(abstract_definition(ports))
+
+    def time_load(self, ports):
+        AbstractDefinition.load(self.raw, name_spaces=name_spaces, errors=[])
+
+    def peakmem_load(self, ports):
+        AbstractDefinition.load(self.raw, name_spaces=name_spaces, errors=[])
+
+
+class FromXML(object):
+    params = [10, 100, 1000]
+    param_names = ['ports']
+
+    def setup(self, ports):
+        self.document = abstract_definition(ports)
+
+    def from_xml(self):
+        instance = AbstractDefinition()
+        instance.from_xml(copy_root(self.document),
+                          name_spaces=dict(name_spaces))
+        instance.validate(errors=[])
+
+    def time_from_xml(self, ports):
+        self.from_xml()
+
+    def peakmem_from_xml(self, ports):
+        self.from_xml()
+
+
+class Serialize(object):
+    params = [10, 100, 1000]
+    param_names = ['ports']
+
+    def setup(self, ports):
+        self.instance = AbstractDefinition.from_dict(
+            root_data(abstract_definition(ports)), name_spaces=name_spaces,
+            errors=[])
+
+    def time_serialize(self, ports):
+        self.instance.serialize(name_spaces=name_spaces, errors=[])
+
+    def peakmem_serialize(self, ports):
+        self.instance.serialize(name_spaces=name_spaces, errors=[])
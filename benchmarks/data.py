@@ -0,0 +1,64 @@
+"""
+Input data of the benchmarks, dicts as created by xmltodict scaled to a
+given size. The schema definitions of the tests are imported from the
+working tree, xmodels itself from the environment under benchmark.
+"""
+import copy
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    # appended, an installed xmodels takes precedence over the working tree
+    sys.path.append(ROOT)
+
+from tests.definitions import AbstractDefinition, name_spaces  # noqa
+
+ROOT_KEY = 'spirit:abstractionDefinition'
+
+
+def abstract_definition(ports):
+    """Returns tests/abstractDefinition.json with the ports repeated to
+    ports items."""
+    with open(os.path.join(ROOT, 'tests', 'abstractDefinition.json')) as f:
+        document = json.load(f)
+    template = document[ROOT_KEY]['spirit:ports']['spirit:port']
+    items = []
+    for index in range(ports):
+        item = copy.deepcopy(template[index % len(template)])
+        item['spirit:logicalName'] = 'port%d' % index
+        items.append(item)
+    document[ROOT_KEY]['spirit:ports']['spirit:port'] = items
+    return document
+
+
+def root_data(document):
+    """Returns the root element content without name space declarations,
+    as accepted by from_dict."""
+    return dict((key, value) for key, value in document[ROOT_KEY].items()
+                if not key.startswith('@'))
+
+
+def copy_root(document):
+    """Returns a copy of document in which only the root element is copied,
+    from_xml removes the name space declarations from it."""
+    return dict((key, dict(value)) for key, value in document.items())
+
+
+def junit_report(suites, cases):
+    """Returns a JUnit XML report with suites test suites of cases passed
+    test cases each. It has no failure and properties elements, which
+    xmodels.schemata.junit does not declare as fields."""
+    report = []
+    for suite in range(suites):
+        testcases = [{'@name': 'test_%d' % case,
+                      '@classname': 'tests.test_module%d' % suite,
+                      '@time': '0.%03d' % (case % 1000)}
+                     for case in range(cases)]
+        report.append({
+            '@name': 'suite%d' % suite, '@timestamp': '2014-11-02T10:00:00',
+            '@hostname': 'localhost', '@package': 'tests',
+            '@id': str(suite), '@errors': '0', '@failures': '0',
+            '@time': '1.5', 'testcase': testcases, 'system-out': 'output'})
+    return {'testsuites': {'testsuite': report}}
@@ -56,7 +56,7 @@ setup(
     author='Bernd Meyer',
     author_email='berndca@gmail.com',
     url='https://github.com/berndca/xmodels',
-    packages=['xmodels'],
+    packages=['xmodels', 'xmodels.iso8601', 'xmodels.schemata'],
     include_package_data=True,
     install_requires=requirements,
     license="BSD",
@@ -264,3 +264,4 @@ class AbstractDefinition(SequenceModel):
             SequenceElement('description'),
         ]
         name_space = SPIRIT_NS
+        root_tag = 'abstractionDefinition'
@@ -0,0 +1,91 @@
+import json
+import os
+
+from tests.definitions import AbstractDefinition, LibraryRef, name_spaces
+from xmodels.cache import ValidationCache, CacheEntry
+
+
+class Parser(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, content):
+        self.calls += 1
+        return json.loads(content)
+
+
+class TestValidationCache():
+    @classmethod
+    def setup_class(cls):
+        tests_path = os.path.split(os.path.abspath(__file__))[0]
+        fn = os.path.join(tests_path, 'abstractDefinition.json')
+        with open(fn) as ad_jfile:
+            cls.content = ad_jfile.read()
+
+    def test_hit(self, tmpdir):
+        cache = ValidationCache(str(tmpdir))
+        parse = Parser()
+        first = cache.validate(self.content, AbstractDefinition, parse,
+                               name_spaces=dict(name_spaces))
+        second = cache.validate(self.content, AbstractDefinition, parse,
+                                name_spaces=dict(name_spaces))
+        assert parse.calls == 1
+        assert first == second == CacheEntry(True, [], None)
+
+    def test_errors(self, tmpdir):
+        cache = ValidationCache(str(tmpdir))
+        content = json.dumps({'spirit:abstractDefinition': {
+            'spirit:vendor': 'Mds'}})
+        parse = Parser()
+        entry = cache.validate(content, AbstractDefinition, parse,
+                               name_spaces=dict(name_spaces))
+        assert not entry.valid
+        entry_get = cache.get(content, AbstractDefinition, parse=parse,
+                              namespace=None, name_spaces=dict(name_spaces))
+        assert entry_get.errors == entry.errors
+
+    def test_instance(self, tmpdir):
+        cache = ValidationCache(str(tmpdir), store_instances=True)
+        parse = Parser()
+        cache.validate(self.content, AbstractDefinition, parse,
+                       name_spaces=dict(name_spaces))
+        entry = cache.get(self.content, AbstractDefinition, parse=parse,
+                          namespace=None, name_spaces=dict(name_spaces))
+        assert entry.instance.busType.name == 'busdef'
+
+    def test_options_key(self, tmpdir):
+        cache = ValidationCache(str(tmpdir))
+        parse = Parser()
+        cache.validate(self.content, AbstractDefinition, parse,
+                       name_spaces=dict(name_spaces))
+        cache.validate(self.content, AbstractDefinition, parse,
+                       name_spaces=dict(name_spaces), clark_names=True)
+        assert parse.calls == 2
+        cache.validate(self.content, AbstractDefinition, json.loads,
+                       name_spaces=dict(name_spaces))
+        cache.validate(self.content, AbstractDefinition, parse,
+                       namespace='other', name_spaces=dict(name_spaces))
+        assert parse.calls == 3
+        assert len(tmpdir.listdir()) == 4
+
+    def test_schema_key(self, tmpdir):
+        cache = ValidationCache(str(tmpdir))
+        cache.put(self.content, AbstractDefinition, [])
+        assert cache.get(self.content, AbstractDefinition) is not None
+        assert cache.get(self.content, LibraryRef) is None
+
+    def test_corrupt_entry(self, tmpdir):
+        cache = ValidationCache(str(tmpdir))
+        key = cache.key(self.content, AbstractDefinition)
+        tmpdir.join(key + cache.suffix).write('garbage')
+        assert cache.get(self.content, AbstractDefinition) is None
+
+    def test_evict(self, tmpdir):
+        cache = ValidationCache(str(tmpdir), max_size=1)
+        cache.put('a', AbstractDefinition, [])
+        cache.put('b', AbstractDefinition, [])
+        assert cache.get('a', AbstractDefinition) is None
+        assert cache.get('b', AbstractDefinition) is None
+        cache.max_size = 10000
+        cache.put('a', AbstractDefinition, [])
+        assert cache.get('a', AbstractDefinition) is not None
@@ -0,0 +1,199 @@
+from xmodels import CharField, IntegerField, FloatField, ModelField, \
+    ModelCollectionField, SequenceModel, AttributeModel
+from xmodels.codegen import compile_model, generate_source
+from xmodels.constraints import ID
+from xmodels.fields import AttributeField, EnumField, RequiredAttribute
+from xmodels.interning import StringInternTable
+from xmodels.models import SequenceElement, Choice
+
+
+def define():
+    """Returns a fresh copy of a hierarchical schema."""
+    class VLNV(AttributeModel):
+        vendor = CharField()
+        library = CharField()
+        name = CharField()
+        version = CharField()
+
+        class Meta:
+            required_attributes = ['vendor', 'library', 'name', 'version']
+
+    class Child(SequenceModel):
+        name = CharField()
+        alignment = RequiredAttribute(EnumField(options=['serial',
+                                                         'parallel']))
+
+        class Meta:
+            sequence = [SequenceElement('name', min_occurs=1)]
+
+    class Parent(SequenceModel):
+        name = CharField()
+        id = AttributeField(ID())
+        busRef = ModelField(VLNV)
+        count = IntegerField(min=0, default=0)
+        child = ModelCollectionField(Child)
+        timingConstraint = FloatField(min=0, max=100)
+        driveConstraint = CharField()
+        loadConstraint = CharField()
+
+        class Meta:
+            sequence = [
+                SequenceElement('name', min_occurs=1),
+                SequenceElement('busRef', min_occurs=1),
+                SequenceElement('count'),
+                SequenceElement('child'),
+                Choice(options=[
+                    [
+                        SequenceElement('timingConstraint', min_occurs=1),
+                        SequenceElement('driveConstraint'),
+                        SequenceElement('loadConstraint'),
+                    ],
+                    [
+                        SequenceElement('driveConstraint', min_occurs=1),
+                        SequenceElement('loadConstraint'),
+                    ],
+                    SequenceElement('loadConstraint', min_occurs=1),
+                ]),
+            ]
+
+    return Parent
+
+
+def parent_dict(**kwargs):
+    result = {'name': 'test', '@id': 'ID1', 'count': '3',
+              'busRef': {'@vendor': 'vendor.com', '@library': 'lib',
+                         '@name': 'Bus', '@version': 'v1.0'},
+              'child': [{'name': 'a', '@alignment': 'serial'},
+                        {'name': 'b', '@alignment': 'parallel'}],
+              'timingConstraint': '12.5', 'driveConstraint': 'strong'}
+    result.update(kwargs)
+    return dict((key, value) for key, value in result.items()
+                if value is not None)
+
+
+def run(model_class, raw_data, **kwargs):
+    errors = []
+    instance = model_class()
+    instance.populate(raw_data, errors=errors, **kwargs)
+    instance.validate(errors=errors, **kwargs)
+    return instance, errors
+
+
+def compare(raw_data, **kwargs):
+    generic, generic_errors = run(define(), raw_data, **kwargs)
+    compiled, compiled_errors = run(compile_model(define()), raw_data,
+                                    **kwargs)
+    assert compiled_errors == generic_errors
+    assert compiled._data_sequence == generic._data_sequence
+    if not generic_errors:
+        assert compiled.serialize() == generic.serialize()
+    return compiled, compiled_errors
+
+
+def test_compile_installs_methods():
+    model_class = compile_model(define())
+    assert model_class._populate._generated
+    assert model_class._validate._generated
+    busref_class = model_class._clsfields['busRef']._wrapped_class
+    assert busref_class._populate._generated
+
+
+def test_compile_not_recursive():
+    model_class = compile_model(define(), recursive=False)
+    busref_class = model_class._clsfields['busRef']._wrapped_class
+    assert not hasattr(busref_class._populate, '_generated')
+
+
+def test_generate_source():
+    source = generate_source(define())
+    assert 'def _populate(self, data, context):' in source
+    assert "if 'busRef' in present:" in source
+
+
+def test_valid():
+    compiled, errors = compare(parent_dict())
+    assert errors == []
+    assert compiled.count == 3
+    assert compiled.child[1].alignment == 'parallel'
+    assert compiled._data_sequence == ['name', 'busRef', 'count', 'child',
+                                       'timingConstraint', 'driveConstraint']
+
+
+def test_field_errors():
+    compiled, errors = compare(parent_dict(count='-1', timingConstraint='x'))
+    assert len(errors) == 2
+    assert not compiled._validated
+
+
+def test_validated():
+    compiled, errors = compare(parent_dict())
+    assert compiled._validated
+    assert compiled.child[0]._validated
+
+
+def test_nested_errors():
+    child = [{'name': 'a', '@alignment': 'diagonal'}, {'@alignment': 'serial'}]
+    compiled, errors = compare(parent_dict(child=child))
+    assert len(errors) == 2
+
+
+def test_missing_required_element():
+    compiled, errors = compare(parent_dict(name=None))
+    assert len(errors) == 1
+    assert errors[0].field == 'name'
+
+
+def test_choice_second_option():
+    compiled, errors = compare(parent_dict(timingConstraint=None,
+                                           loadConstraint='medium'))
+    assert compiled._data_sequence[-2:] == ['driveConstraint',
+                                            'loadConstraint']
+
+
+def test_choice_no_match():
+    compiled, errors = compare(parent_dict(timingConstraint=None,
+                                           driveConstraint=None))
+    assert len(errors) == 1
+
+
+def test_extra_element():
+    compiled, errors = compare(parent_dict(unknown='x'))
+    assert compiled._extra == {'unknown': 'x'}
+    assert len(errors) == 1
+
+
+def test_string_intern():
+    compare(parent_dict(), string_intern=StringInternTable())
+
+
+def test_facets_changed_after_compile():
+    model_class = compile_model(define())
+    model_class._clsfields['driveConstraint'].maxLength = 3
+    instance, errors = run(model_class, parent_dict())
+    assert len(errors) == 1
+    assert errors[0].field == 'driveConstraint'
+
+
+def test_uncompiled_subclass():
+    model_class = compile_model(define())
+
+    class Sub(model_class):
+        name = CharField()
+
+        class Meta:
+            sequence = [SequenceElement('name', min_occurs=1)]
+
+    instance, errors = run(Sub, {'name': 'sub'})
+    assert errors == []
+    assert instance._data_sequence == ['name']
+
+
+def test_overridden_method_kept():
+    model_class = define()
+
+    def validate(self, **kwargs):
+        return 'custom'
+
+    model_class.validate = validate
+    compile_model(model_class)
+    assert model_class().validate() == 'custom'
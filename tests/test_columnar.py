@@ -0,0 +1,78 @@
+import pytest
+
+from xmodels import CharField, IntegerField, FloatField, BooleanField, \
+    ModelField, Model
+from xmodels.columnar import to_columns, NumericColumn, DictionaryColumn
+from tests.definitions import Size
+
+
+class Case(Model):
+    name = CharField()
+    classname = CharField()
+    time = FloatField()
+    assertions = IntegerField()
+    skipped = BooleanField()
+    size = ModelField(Size)
+
+
+def cases():
+    for index in range(6):
+        raw = {'name': 'test_%d' % index, 'classname': 'cls%d' % (index % 2),
+               'time': '%d.5' % index, 'skipped': index == 3}
+        if index != 4:
+            raw['assertions'] = index
+        yield Case.from_dict(raw, errors=[])
+
+
+class TestToColumns(object):
+    @classmethod
+    def setup_class(cls):
+        cls.columns = to_columns(cases())
+
+    def test_default_fields(self):
+        assert list(self.columns) == list(
+            key for key in Case._field_names if key != 'size')
+
+    def test_numeric(self):
+        column = self.columns['time']
+        assert isinstance(column, NumericColumn)
+        assert column.values.typecode == 'd'
+        assert sum(column.values) == 18.0
+        assert column.valid is None
+
+    def test_missing_values(self):
+        column = self.columns['assertions']
+        assert list(column.values) == [0, 1, 2, 3, 0, 5]
+        assert column[4] is None
+        assert column[5] == 5
+
+    def test_boolean(self):
+        assert list(self.columns['skipped'].values) == [0, 0, 0, 1, 0, 0]
+
+    def test_dictionary(self):
+        column = self.columns['classname']
+        assert isinstance(column, DictionaryColumn)
+        assert column.dictionary == ['cls0', 'cls1']
+        assert list(column.codes) == [0, 1, 0, 1, 0, 1]
+        assert column[3] == 'cls1'
+
+    def test_projection(self):
+        columns = to_columns(cases(), fields=['time', 'size'])
+        assert list(columns) == ['time', 'size']
+        assert list(columns['size'].codes) == [-1] * 6
+
+    def test_attribute_fields(self):
+        sizes = [Size.from_dict({'#text': str(n), '@format': 'long'},
+                                errors=[]) for n in (8, 16, 32)]
+        columns = to_columns(sizes, fields=['size_int', 'format'])
+        assert list(columns['size_int'].values) == [8, 16, 32]
+        assert list(columns['format'].codes) == [0, 0, 0]
+
+    def test_empty(self):
+        assert to_columns([]) == {}
+
+    def test_numpy(self):
+        numpy = pytest.importorskip('numpy')
+        assert numpy.sum(self.columns['time'].to_numpy()) == 18.0
+        assert self.columns['assertions'].to_numpy().sum() == 11
+        assert list(self.columns['classname'].to_numpy()) == [0, 1] * 3
@@ -0,0 +1,76 @@
+from tests.definitions import LoadConstraint
+from xmodels import CharField, Model, ModelCollectionField
+from xmodels.constraints import Stores
+from xmodels.context import ValidationContext
+
+
+def test_default_errors():
+    errors = []
+    assert ValidationContext(errors=errors).errors is errors
+    context = ValidationContext()
+    assert context.errors == []
+    assert context.kwargs['errors'] is context.errors
+
+
+def test_from_kwargs():
+    context = ValidationContext()
+    assert ValidationContext.from_kwargs(dict(context=context)) is context
+    context = ValidationContext.from_kwargs(dict(path='root'))
+    assert context.path == 'root'
+
+
+def test_push_pop():
+    stores = Stores()
+    context = ValidationContext(path='root', stores=stores)
+    context.push('root.child')
+    context.stores = Stores()
+    context.instance_index = 2
+    assert context.kwargs['path'] == 'root.child'
+    context.pop()
+    assert context.path == 'root'
+    assert context.stores is stores
+    assert context.instance_index is None
+
+
+def test_shared_context():
+    context = ValidationContext(stores=Stores())
+    LoadConstraint.from_dict({'@id': 'a', '#text': 'x'}, context=context)
+    assert context.errors == []
+    LoadConstraint.from_dict({'@id': 'a', '#text': 'y'}, context=context)
+    assert len(context.errors) == 1
+
+
+def test_stores_scope():
+    context = ValidationContext()
+    LoadConstraint.from_dict({'@id': 'a', '#text': 'x'}, context=context)
+    assert context.stores is None
+    LoadConstraint.from_dict({'@id': 'a', '#text': 'y'}, context=context)
+    assert context.errors == []
+    stores = Stores()
+    context = ValidationContext(stores=stores)
+    context.push('root')
+    LoadConstraint.from_dict({'@id': 'a', '#text': 'x'}, context=context)
+    context.pop()
+    assert context.stores is stores
+    assert stores.idStore.keys
+
+
+def test_overridden_validate_called():
+    calls = []
+
+    class Item(Model):
+        name = CharField()
+
+        def validate(self, **kwargs):
+            calls.append(str(kwargs['path']))
+            return super(Item, self).validate(**kwargs)
+
+    class Items(Model):
+        item = ModelCollectionField(Item)
+
+    errors = []
+    instance = Items.from_dict({'item': [{'name': 'a'}, {'name': 'b'}]},
+                               errors=errors)
+    assert errors == []
+    assert calls == ['Items', 'Items']
+    assert str(instance.item[1]._path) == 'Items.Item[1]'
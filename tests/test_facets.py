@@ -0,0 +1,71 @@
+import pytest
+
+from xmodels.facets import compile_facets, generate_source
+from xmodels.fields import CharField, FloatField, IntegerField, Name, \
+    NonNegativeInteger, RegexField, Token
+
+
+def test_string_facets():
+    check = compile_facets('string', dict(whiteSpace='collapse', minLength=2,
+                                          maxLength=5, pattern=r'^[a-z ]+$'))
+    assert check(' a\t b ') == (True, 'a b')
+    assert check(3) == (False, 'Invalid value')
+    assert check('a') == (False, 'Expecting string longer than 2 characters')
+    assert check('abcdef') == (False,
+                               'Expecting string shorter than 5 characters')
+    assert check('AB') == (False, 'The input does not match the regex')
+
+
+def test_length_and_enumeration():
+    check = compile_facets('string', dict(length=2, enumeration=['ab', 'cd']),
+                           dict(notIn='%(value)s not in %(items)s'))
+    assert check('cd') == (True, 'cd')
+    assert check('abc') == (False, 'Expecting string of 2 characters')
+    assert check('ef') == (False, 'ef not in ab, cd')
+
+
+def test_range_facets():
+    check = compile_facets('integer', dict(minExclusive=0, maxInclusive=10))
+    assert check('10') == (True, 10)
+    assert check('0') == (False, 'Expecting value greater than 0')
+    assert check('11') == (False, 'Expecting value less than 10')
+    assert check('x') == (False, 'Invalid value')
+    check = compile_facets('float', dict(maxExclusive=1))
+    assert check('0.5') == (True, '0.5')
+    assert check('1.0') == (False, 'Expecting value less than 1')
+
+
+def test_only_given_facets_generated():
+    source = generate_source('string', dict(strip=True, maxLength=None))
+    assert 'size' not in source
+    assert 'raw_data.strip()' in source
+
+
+def test_invalid_white_space():
+    with pytest.raises(AssertionError):
+        compile_facets('string', dict(whiteSpace='trim'))
+
+
+class TestFieldFacets(object):
+
+    def test_fields_match_validate(self):
+        fields_values = [(CharField(minLength=2), ' a '), (Token(), 'a  b'),
+                         (RegexField(regex=r'^\d+$'), 'a1'),
+                         (Name(), 'a:b:c'), (NonNegativeInteger(), '-1'),
+                         (FloatField(max=2.5), '3')]
+        for field, value in fields_values:
+            with pytest.raises(Exception) as exc_info:
+                field.validate(value)
+            assert field.check(value) == (False, exc_info.value.msg)
+
+    def test_recompiled_after_set(self):
+        field = IntegerField(max=10)
+        assert field.check('8') == (True, 8)
+        field.max = 5
+        assert field.check('8') == (False, 'Expecting value less than 5')
+
+    def test_equality_ignores_compiled_check(self):
+        field = CharField(maxLength=3)
+        field.check('abc')
+        assert field == CharField(maxLength=3)
+        assert field != CharField(maxLength=4)
@@ -1,4 +1,8 @@
+from array import array
 import datetime
+import os
+import subprocess
+import sys
 
 import pytest
 
@@ -12,6 +16,7 @@ from xmodels.fields import IntegerField, BooleanField, \
     PositiveInteger, NegativeInteger, EnumField, DateTimeField, DateField, \
     TimeField, AttributeField, RequiredAttribute
 from xmodels.iso8601 import Timezone
+from xmodels.utils import Message, ModelPath
 
 
 def test_validation_exception():
@@ -19,6 +24,23 @@ def test_validation_exception():
     assert str(e) == 'ValidationException: This is a violation, value:41'
 
 
+def test_validation_exception_lazy_msg():
+    msg = Message('Value %s too large', (41,))
+    e = ValidationException(msg, 41)
+    assert msg._text is None
+    assert e.lazy_msg is msg
+    assert e.msg == 'Value 41 too large'
+    assert msg == 'Value 41 too large'
+    assert hash(msg) == hash('Value 41 too large')
+
+
+def test_model_path():
+    path = ModelPath(ModelPath('', 'Parent'), 'Child', 2)
+    assert path == 'Parent.Child[2]'
+    assert str(ModelPath(path, None, 0)) == 'Parent.Child[2][0]'
+    assert {path: 1}['Parent.Child[2]'] == 1
+
+
 class TestBaseField():
     @classmethod
     def setup_class(cls):
@@ -158,6 +180,46 @@ class TestToken():
         assert actual == 'valid:OK single space'
 
 
+class TestWhiteSpace(object):
+
+    def test_preserve(self):
+        field = CharField(whiteSpace='preserve')
+        assert field.validate(' a\tb ') == ' a\tb '
+
+    def test_replace(self):
+        field = CharField(whiteSpace='replace')
+        assert field.validate(' a\tb\r\n') == ' a b  '
+        value = 'already replaced'
+        assert field.validate(value) is value
+
+    def test_collapse(self):
+        field = CharField(whiteSpace='collapse')
+        assert field.validate(' a\t\n b  c ') == 'a b c'
+        value = 'already collapsed'
+        assert field.validate(value) is value
+
+    def test_strict(self):
+        field = CharField(whiteSpace='replace', whiteSpaceStrict=True)
+        ok, msg = field.check('a\tb')
+        assert not ok
+        assert msg == 'Whitespace is not normalized.'
+
+    def test_token(self):
+        field = Token()
+        assert field.validate(' a b\n') == 'a b'
+        for value in ['a\tb', 'a  b', ' a \n b']:
+            with pytest.raises(ValidationException) as exc_info:
+                field.validate(value)
+            assert exc_info.value.msg == field.messages['whitespace']
+
+    def test_name_collapsed(self):
+        assert NMTOKEN().validate('\t nm-token\r\n') == 'nm-token'
+
+    def test_invalid_facet(self):
+        with pytest.raises(AssertionError):
+            CharField(whiteSpace='trim')
+
+
 class TestRegexField():
     @classmethod
     def setup_class(cls):
@@ -484,6 +546,82 @@ class TestEnumField():
             items=self.instance._options_str, value='invalid')
         assert exc_info.value.msg == message
 
+    def test_canonical_option(self):
+        value = ''.join(['Tw', 'o'])
+        assert self.instance.validate(value) is self.instance.options[1]
+
+    def test_lookups_precomputed(self):
+        assert self.instance.lookup_lower['three'] == 'Three'
+
+
+class TestEnumFieldCodes():
+    @classmethod
+    def setup_class(cls):
+        class Port(Model):
+            direction = EnumField(options=['in', 'out', 'inout'], codes=True)
+            presence = AttributeField(EnumField(
+                options=['required', 'optional'], codes=True))
+
+        cls.cls = Port
+        cls.field = EnumField(options=['in', 'out', 'inout'], codes=True)
+
+    def test_validate(self):
+        assert self.field.validate('OUT') == 1
+        code = self.field.validate('inout')
+        assert self.field.validate(code) == 2
+
+    def test_invalid_code(self):
+        with pytest.raises(ValidationException):
+            self.field.validate(3)
+        with pytest.raises(ValidationException):
+            self.field.validate(2)
+        assert self.field.check(2)[0] is False
+
+    def test_serialize(self):
+        assert self.field.serialize(self.field.validate('inout')) == 'inout'
+
+    def test_model(self):
+        errors = []
+        port = self.cls.from_dict({'direction': 'out',
+                                   '@presence': 'optional'}, errors=errors)
+        assert errors == []
+        assert port._data == {'direction': 1, 'presence': 1}
+        assert port.direction == 'out'
+        assert port.presence == 'optional'
+        port.validate(errors=errors)
+        assert errors == []
+        assert port.serialize() == {'direction': 'out',
+                                    '@presence': 'optional'}
+
+    def test_collection(self):
+        class Ports(Model):
+            directions = FieldCollectionField(
+                EnumField(options=['in', 'out', 'inout'], codes=True))
+
+        errors = []
+        raw = {'directions': ['in', 'OUT']}
+        ports = Ports.from_dict(raw, errors=errors)
+        assert errors == []
+        assert ports._data == {'directions': [0, 1]}
+        assert ports.directions == ['in', 'out']
+        assert ports.serialize() == {'directions': ['in', 'out']}
+        assert ports.serialize(trusted=True) == ports.serialize()
+        view = Ports.view(raw)
+        view.validate(errors=errors)
+        assert errors == []
+        assert view.serialize() == ports.serialize()
+
+    def test_raw_integer(self):
+        errors = []
+        self.cls.from_dict({'direction': 1}, errors=errors)
+        assert len(errors) == 1
+        assert 'Expecting a string' in str(errors[0])
+        port = self.cls()
+        port.populate({'direction': 1})
+        errors = []
+        port.validate(errors=errors)
+        assert len(errors) == 1
+
 
 class TestFormattedDateTimeField():
     @classmethod
@@ -932,3 +1070,156 @@ class TestFieldCollectionFieldBasic():
         field = FieldCollectionField(FloatField(serial_format='{0:.3f}'))
         result = field.serialize(4)
         assert result == ['4.000']
+
+
+class TestCheck(object):
+
+    def test_valid(self):
+        assert IntegerField(min=0).check('12') == (True, 12)
+        assert FloatField().check('1.5') == (True, '1.5')
+        assert CharField().check(' abc ') == (True, 'abc')
+        assert BooleanField().check('true') == (True, True)
+        assert BaseField().check('x') == (True, 'x')
+
+    def test_invalid_matches_validate(self):
+        fields_values = [(IntegerField(), 'x'), (IntegerField(max=3), '4'),
+                         (FloatField(min=1), '0.5'), (CharField(), 5),
+                         (CharField(maxLength=2), 'abc'),
+                         (EnumField(options=['a', 'b']), 'c'),
+                         (Token(), 'a  b'), (DateField(), 'no date')]
+        for field, value in fields_values:
+            with pytest.raises(ValidationException) as exc_info:
+                field.validate(value)
+            ok, msg = field.check(value)
+            assert not ok
+            assert msg == exc_info.value.msg
+
+    def test_enum(self):
+        field = EnumField(options=['in', 'out'], codes=True)
+        assert field.check('OUT') == (True, 1)
+        assert field._raw == 'out'
+        assert field.check(field.check('in')[1]) == (True, 0)
+        assert field.check(0)[0] is False
+
+    def test_attribute(self):
+        field = RequiredAttribute(IntegerField())
+        assert field.check(None) == (False, field.messages['required'])
+        assert AttributeField(IntegerField()).check(None) == (True, None)
+        assert field.check('3') == (True, 3)
+
+    def test_overridden_validate(self):
+        class Even(IntegerField):
+            def validate(self, raw_data, **kwargs):
+                value = super(Even, self).validate(raw_data, **kwargs)
+                if value % 2:
+                    raise ValidationException('odd', raw_data)
+                return value
+
+        assert Even().check('3') == (False, 'odd')
+        assert Even().check('4') == (True, 4)
+
+
+class TestFieldCollectionFieldItems(object):
+
+    def validate_both(self, field, data, monkeypatch):
+        """Returns the results of the vectorized and the scalar path."""
+        results = []
+        for numpy in (pytest.importorskip('numpy'), None):
+            monkeypatch.setattr('xmodels.fields.numpy', numpy)
+            try:
+                results.append(field.validate(data))
+            except ValidationException as e:
+                results.append((e.msg, e.item_errors))
+        assert results[0] == results[1]
+        return results[0]
+
+    def test_item_errors(self):
+        field = FieldCollectionField(IntegerField(min=0))
+        with pytest.raises(ValidationException) as excinfo:
+            field.validate(['1', 'x', '-1'])
+        assert excinfo.value.item_errors == [
+            (1, 'Could not convert to int:'),
+            (2, 'Expecting value greater than 0')]
+        assert excinfo.value.msg == '[1] Could not convert to int:; ' \
+                                    '[2] Expecting value greater than 0'
+
+    def test_integers(self, monkeypatch):
+        field = FieldCollectionField(IntegerField(min=0))
+        data = [str(index) for index in range(100)] + [7, True]
+        result = self.validate_both(field, data, monkeypatch)
+        assert result[-3:] == [99, 7, 1]
+
+    def test_integers_range(self, monkeypatch):
+        field = FieldCollectionField(NonNegativeInteger(max=90))
+        data = [str(index - 5) for index in range(100)]
+        msg, item_errors = self.validate_both(field, data, monkeypatch)
+        assert [index for index, _ in item_errors] == \
+            [0, 1, 2, 3, 4, 96, 97, 98, 99]
+
+    def test_integers_invalid(self, monkeypatch):
+        field = FieldCollectionField(IntegerField())
+        data = ['1'] * 80 + ['1.5']
+        msg, item_errors = self.validate_both(field, data, monkeypatch)
+        assert item_errors == [(80, 'Could not convert to int:')]
+
+    def test_floats(self, monkeypatch):
+        field = FieldCollectionField(FloatField(min=0, max=1))
+        data = ['0.%d' % index for index in range(100)]
+        assert self.validate_both(field, data, monkeypatch) == data
+        data[50] = '1.5'
+        msg, item_errors = self.validate_both(field, data, monkeypatch)
+        assert item_errors == [(50, 'Expecting value less than 1')]
+
+
+class TestFieldCollectionFieldTyped(object):
+
+    def test_integers(self):
+        field = FieldCollectionField(IntegerField(), typed=True)
+        result = field.validate(['1', '2', 3])
+        assert isinstance(result, array)
+        assert list(result) == [1, 2, 3]
+
+    def test_floats(self):
+        field = FieldCollectionField(FloatField(), typed=True)
+        result = field.deserialize(['0.5', '1'])
+        assert result.typecode == 'd'
+        assert list(result) == [0.5, 1.0]
+
+    def test_vectorized(self):
+        pytest.importorskip('numpy')
+        field = FieldCollectionField(IntegerField(min=0), typed=True)
+        result = field.validate([str(index) for index in range(100)])
+        assert isinstance(result, array)
+        assert list(result) == list(range(100))
+
+    def test_numpy_imported_lazily(self):
+        pytest.importorskip('numpy')
+        code = ('import sys, xmodels; assert "numpy" not in sys.modules; '
+                'xmodels.FieldCollectionField(xmodels.IntegerField())'
+                '.validate(["1"] * 100); assert "numpy" in sys.modules')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.check_call([sys.executable, '-c', code], cwd=root)
+
+    def test_overflow(self):
+        field = FieldCollectionField(IntegerField(), typed=True)
+        assert field.validate(['1', str(2 ** 70)]) == [1, 2 ** 70]
+
+    def test_not_numeric(self):
+        field = FieldCollectionField(CharField(), typed=True)
+        assert field.validate(['a', 'b']) == ['a', 'b']
+
+    def test_revalidate_and_serialize(self):
+        field = FieldCollectionField(IntegerField(), typed=True)
+        result = field.validate(field.validate(['1', '2']))
+        assert list(result) == [1, 2]
+        assert field.serialize(result) == [1, 2]
+
+    def test_model(self):
+        class Table(Model):
+            values = FieldCollectionField(FloatField(), typed=True)
+
+        table = Table.from_dict({'values': ['1.5', '2.5']}, errors=[])
+        clone = table.clone()
+        clone.values[0] = 0.0
+        assert table.values[0] == 1.5
+        assert table.serialize() == {'values': ['1.5', '2.5']}
@@ -0,0 +1,143 @@
+import sys
+
+import pytest
+from six.moves import intern
+
+from tests.definitions import VLNVAttributes
+from xmodels import AttributeModel, CharField, ModelCollectionField, \
+    SequenceModel
+from xmodels.interning import ModelInternTable, StringInternTable
+from xmodels.models import SequenceElement
+
+
+class BusRefs(SequenceModel):
+    busRef = ModelCollectionField(VLNVAttributes)
+
+    class Meta:
+        sequence = [SequenceElement('busRef')]
+
+
+NS = 'urn:test'
+
+
+class NsRef(AttributeModel):
+    name = CharField()
+
+    class Meta:
+        name_space = NS
+
+
+class NsRefs(SequenceModel):
+    ref = ModelCollectionField(NsRef)
+
+    class Meta:
+        name_space = NS
+        sequence = [SequenceElement('ref')]
+
+
+def vlnv(name):
+    return {'@vendor': 'vendor.com', '@library': 'testLibrary',
+            '@name': name, '@version': 'v1.0'}
+
+
+class TestModelInternTable():
+    @classmethod
+    def setup_class(cls):
+        cls.raw = {'busRef': [vlnv('bus'), vlnv('bus'), vlnv('other'),
+                              vlnv('bus')]}
+
+    def test_shared_instances(self):
+        table = ModelInternTable()
+        errors = []
+        inst = BusRefs.from_dict(self.raw, model_intern=table, errors=errors)
+        refs = inst.busRef
+        assert not errors
+        assert refs[0] is refs[1] is refs[3]
+        assert refs[0] is not refs[2]
+        assert len(table) == 2
+        assert table.hits == 2
+
+    def test_not_interned_by_default(self):
+        refs = BusRefs.from_dict(self.raw).busRef
+        assert refs[0] is not refs[1]
+        assert refs[0] == refs[1]
+
+    def test_frozen(self):
+        inst = BusRefs.from_dict(self.raw, model_intern=ModelInternTable())
+        with pytest.raises(AttributeError):
+            inst.busRef[0].name = 'changed'
+        clone = inst.busRef[0].clone()
+        clone.name = 'changed'
+        assert inst.busRef[1].name == 'bus'
+
+    def test_serialize(self):
+        inst = BusRefs.from_dict(self.raw, model_intern=ModelInternTable())
+        assert inst.serialize() == BusRefs.from_dict(self.raw).serialize()
+
+    def test_name_spaces(self):
+        table = ModelInternTable(weak=True)
+        errors = []
+        inst = NsRefs.from_dict({'x:ref': [{'@x:name': 'a'}]},
+                                name_spaces={NS: 'x'}, model_intern=table,
+                                errors=errors)
+        assert errors == []
+        other = NsRefs.from_dict({'ref': [{'@x:name': 'a'}]},
+                                 model_intern=table, errors=errors)
+        assert len(errors) == 1
+        assert other.ref[0] is not inst.ref[0]
+
+    def test_validated_once(self):
+        inst = BusRefs()
+        inst.populate(self.raw, model_intern=ModelInternTable())
+        errors = []
+        inst.validate(errors=errors)
+        assert not errors
+        refs = inst.busRef
+        assert refs[0]._validated
+        assert refs[3]._path.index == 0
+
+    def test_weak_table(self):
+        table = ModelInternTable(weak=True)
+        inst = BusRefs.from_dict(self.raw, model_intern=table)
+        assert len(table) == 2
+        del inst
+        assert len(table) == 0
+
+
+def copied(value):
+    return ''.join(list(value))
+
+
+class TestStringInternTable():
+    def test_intern(self):
+        table = StringInternTable()
+        first = table.intern(copied('spirit:vendor'))
+        second = copied('spirit:vendor')
+        assert table.intern(second) is first
+        assert table.hits == 1
+        assert table.saved_bytes == sys.getsizeof(second)
+
+    def test_long_strings_ignored(self):
+        table = StringInternTable(max_length=4)
+        value = copied('too long')
+        assert table.intern(value) is value
+        assert len(table) == 0
+
+    def test_global(self):
+        table = StringInternTable(use_global=True)
+        assert table.intern(copied('direction')) is intern('direction')
+
+    def test_intern_list(self):
+        table = StringInternTable()
+        values = [copied('in'), copied('in')]
+        table.intern_value(values)
+        assert values[0] is values[1]
+
+    def test_populate_validate(self):
+        table = StringInternTable()
+        raw = {'busRef': [vlnv(copied('bus')), vlnv(copied('bus '))]}
+        inst = BusRefs.from_dict(raw, string_intern=table)
+        assert inst.busRef[0].name is inst.busRef[1].name
+        assert inst.busRef[0].vendor is inst.busRef[1].vendor
+        assert table.saved_bytes > 0
+        assert str(table).startswith('StringInternTable: ')
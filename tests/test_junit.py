@@ -0,0 +1,40 @@
+from xmodels.schemata import junit
+
+
+def junit_dict():
+    return {'testsuites': {'testsuite': [{
+        '@name': 'suite', '@timestamp': '2014-11-02T10:00:00',
+        '@hostname': 'localhost', '@package': 'tests', '@id': '0',
+        '@errors': '0', '@failures': '0', '@time': '0.5',
+        'testcase': [
+            {'@name': 'test_a', '@classname': 'tests.test_a',
+             '@time': '0.1'},
+            {'@name': 'test_b', '@classname': 'tests.test_a',
+             '@time': '0.4'}],
+        'system-out': 'output'}]}}
+
+
+def test_ingest():
+    instance = junit.TestSuites()
+    instance.from_xml(junit_dict())
+    errors = []
+    instance.validate(errors=errors)
+    assert errors == []
+    suite = instance.testsuite[0]
+    assert suite.failures == 0
+    assert suite.timestamp == '2014-11-02T10:00:00'
+    assert [case.name for case in suite.testcase] == ['test_a', 'test_b']
+    assert suite.system_out == 'output'
+    result = instance.serialize(trusted=True)
+    assert result['testsuite'][0]['testcase'][1] == {
+        '@name': 'test_b', '@classname': 'tests.test_a', '@time': '0.4'}
+
+
+def test_invalid():
+    raw = junit_dict()
+    raw['testsuites']['testsuite'][0]['@errors'] = 'none'
+    instance = junit.TestSuites()
+    instance.from_xml(raw)
+    errors = []
+    instance.validate(errors=errors)
+    assert len(errors) == 1
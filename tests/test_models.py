@@ -1,5 +1,7 @@
 import json
+import logging
 import os
+import pickle
 
 try:
     from collections import OrderedDict
@@ -10,13 +12,16 @@ import datetime
 import pytest
 
 from xmodels.constraints import ID, InitStores
-from xmodels.fields import AttributeField, DateTimeField, FloatField, Name, \
-    RequiredAttribute
+from xmodels.fields import AttributeField, BooleanField, DateTimeField, \
+    FloatField, Name, RequiredAttribute, EnumField, FieldCollectionField, \
+    ModelCollectionField
 from tests.definitions import HierarchicalSequenceModel, Size, \
-    VendorExtensions, name_spaces, Port, AbstractDefinition, LibraryRef
-from xmodels import CharField, Model, IntegerField, ModelField, SequenceModel
-from xmodels.models import SequenceElement, Choice
-from xmodels.utils import MsgRecord
+    VendorExtensions, name_spaces, Port, AbstractDefinition, LibraryRef, \
+    SPIRIT_NS
+from xmodels import CharField, Model, IntegerField, ModelField, \
+    SequenceModel, AttributeModel, ValidationException, load
+from xmodels.models import SequenceElement, Choice, get_root_model
+from xmodels.utils import MsgRecord, to_clark
 
 
 class TestElementNoAttributes(object):
@@ -518,6 +523,20 @@ class TestSequenceModels():
                                     msg='Missing required key: size ')]
 
 
+def test_sequence_model_without_sequence():
+    class Unordered(SequenceModel):
+        name = CharField()
+        size = IntegerField()
+
+    inst = Unordered()
+    inst.populate({'size': '1', 'name': 'a'})
+    assert inst.serialize() == {'size': 1, 'name': 'a'}
+    errors = []
+    inst.validate(errors=errors)
+    assert errors == []
+    assert inst.serialize() == {'size': 1, 'name': 'a'}
+
+
 def test_empty_modelfield():
     d = dict(logicalName='lname', wire=None)
     inst = Port.from_dict(d)
@@ -612,3 +631,587 @@ class TestXMLDict():
             ]))
         ])
         assert inst.serialize() == expected
+
+
+class TestModelLoad(object):
+
+    @staticmethod
+    def define():
+        class Item(SequenceModel):
+            name = CharField()
+            weight = FloatField(min=0)
+
+            class Meta:
+                sequence = [SequenceElement('name', min_occurs=1),
+                            SequenceElement('weight')]
+
+        class Order(SequenceModel):
+            id = AttributeField(IntegerField(min=1))
+            created = DateTimeField()
+            state = EnumField(options=['open', 'closed'])
+            quantities = FieldCollectionField(IntegerField(min=0))
+            item = ModelCollectionField(Item)
+            total = FloatField()
+
+            class Meta:
+                sequence = [SequenceElement('created'),
+                            SequenceElement('state', min_occurs=1),
+                            SequenceElement('quantities'),
+                            SequenceElement('item'),
+                            SequenceElement('total')]
+
+        return Order
+
+    def order_dict(self, **kwargs):
+        result = {'@id': '7', 'created': '2020-01-02T03:04:05',
+                  'state': 'OPEN', 'quantities': ['1', '2'],
+                  'item': [{'name': 'a', 'weight': '1.5'}, {'name': 'b'}],
+                  'total': '10'}
+        result.update(kwargs)
+        return result
+
+    def test_equals_from_dict_deserialize(self):
+        order_class = self.define()
+        errors = []
+        loaded = order_class.load(self.order_dict(), errors=errors)
+        expected = order_class.from_dict(self.order_dict(), errors=errors)
+        expected.deserialize(errors=errors)
+        assert errors == []
+        assert loaded == expected
+        assert loaded._data_sequence == expected._data_sequence
+        assert loaded.id == 7
+        assert loaded.created == datetime.datetime(2020, 1, 2, 3, 4, 5)
+        assert loaded.item[0].weight == 1.5
+        assert loaded.total == 10.0
+        assert loaded.item[1]._path == 'Order.Item[1]'
+
+    def test_errors_equal_from_dict(self):
+        order_class = self.define()
+        raw = self.order_dict(**{'@id': '0', 'state': 'pending',
+                                 'quantities': ['1', '-2'], 'total': 'x',
+                                 'item': [{'weight': '-1'}], 'extra': 1})
+        load_errors = []
+        loaded = order_class.load(raw, errors=load_errors)
+        errors = []
+        order_class.from_dict(raw, errors=errors)
+        assert len(errors) == 7
+        assert load_errors == errors
+        assert loaded.total == 'x'
+
+    def test_abstract_definition(self):
+        tests_path = os.path.split(os.path.abspath(__file__))[0]
+        with open(os.path.join(tests_path, 'abstractDefinition.json')) as f:
+            root = next(iter(json.load(f).values()))
+        root = dict((key, value) for key, value in root.items()
+                    if not key.startswith('@'))
+        errors = []
+        loaded = AbstractDefinition.load(root, name_spaces=name_spaces,
+                                         errors=errors)
+        expected = AbstractDefinition.from_dict(root, name_spaces=name_spaces,
+                                                errors=errors)
+        expected.deserialize(errors=errors)
+        assert errors == []
+        assert loaded == expected
+
+
+class TestTrustedSerialize(object):
+
+    def setup_method(self, method):
+        self.errors = []
+        self.inst = TestModelLoad.define().from_dict(
+            TestModelLoad().order_dict(), errors=self.errors)
+
+    def test_validated(self):
+        assert self.errors == []
+        assert self.inst._validated
+        assert self.inst.item[0]._validated
+        assert self.inst.serialize(trusted=True) == self.inst.serialize()
+
+    def test_trusted_skips_checks(self):
+        self.inst._data['state'] = 'pending'
+        assert self.inst.serialize(trusted=True)['state'] == 'pending'
+        errors = []
+        self.inst.serialize(errors=errors)
+        assert len(errors) == 1
+
+    def test_write_clears(self):
+        self.inst.total = 'x'
+        assert not self.inst._validated
+        assert self.inst.item[0]._validated
+        errors = []
+        self.inst.serialize(trusted=True, errors=errors)
+        assert len(errors) == 1
+
+    def test_errors_not_validated(self):
+        errors = []
+        inst = TestModelLoad.define().from_dict(
+            TestModelLoad().order_dict(total='x'), errors=errors)
+        assert not inst._validated
+        assert inst.item[0]._validated
+
+    def test_deserialized(self):
+        self.inst.deserialize(errors=self.errors)
+        assert self.inst._validated
+        assert self.inst.serialize(trusted=True) == self.inst.serialize()
+
+    def test_validated_date_dumped(self):
+        inst = TestModelLoad.define().from_dict(
+            TestModelLoad().order_dict(created='2020-01-02T03:04:05Z'))
+        assert inst.serialize()['created'] != '2020-01-02T03:04:05Z'
+        assert inst.serialize(trusted=True)['created'] == \
+            '2020-01-02T03:04:05Z'
+
+    def test_load(self):
+        inst = TestModelLoad.define().load(TestModelLoad().order_dict())
+        assert inst._validated
+        assert inst.serialize(trusted=True)['created'] == '2020-01-02T03:04:05'
+
+    def test_pickle(self):
+        inst = HierarchicalSequenceModel.from_dict(
+            HierarchicalSequenceModel.gen_parent_min_dict(), errors=[])
+        clone = pickle.loads(pickle.dumps(inst))
+        assert clone._validated
+        assert clone.busRef._validated
+        inst.name = 'changed'
+        assert not pickle.loads(pickle.dumps(inst))._validated
+
+
+class TestClone():
+    @classmethod
+    def setup_class(cls):
+        parent = HierarchicalSequenceModel.gen_parent_min_dict()
+        parent['child'] = HierarchicalSequenceModel.gen_child_min_dict()
+        cls.parent_dict = parent
+
+    def setup_method(self, method):
+        self.original = HierarchicalSequenceModel.from_dict(self.parent_dict)
+
+    def test_clone_shares_data(self):
+        clone = self.original.clone()
+        assert clone._data is self.original._data
+        assert clone.serialize() == self.original.serialize()
+
+    def test_clone_write(self):
+        clone = self.original.clone()
+        clone.name = 'variant'
+        assert clone.name == 'variant'
+        assert self.original.name == 'test'
+        assert clone._data is not self.original._data
+
+    def test_clone_write_original(self):
+        clone = self.original.clone()
+        self.original.name = 'changed'
+        assert clone.name == 'test'
+
+    def test_clone_nested_write(self):
+        clone = self.original.clone()
+        clone.busRef.name = 'OtherBus'
+        assert clone.busRef.name == 'OtherBus'
+        assert self.original.busRef.name == 'BusName'
+        assert clone.child._data is self.original.child._data
+
+    def test_clone_isolated_from_original(self):
+        clone = self.original.clone()
+        self.original.child.name = 'changed'
+        self.original.busRef.name = 'OtherBus'
+        assert clone.child.name == 'child'
+        assert clone.busRef.name == 'BusName'
+        assert self.original.child.name == 'changed'
+
+    def test_clone_isolated_from_original_list(self):
+        class Item(Model):
+            name = CharField()
+
+        class Items(Model):
+            item = ModelCollectionField(Item)
+
+        original = Items.from_dict({'item': [{'name': 'a'}]})
+        clone = original.clone()
+        original.item.append(Item.from_dict({'name': 'b'}))
+        original.item[0].name = 'changed'
+        assert [item.name for item in clone.item] == ['a']
+
+    def test_clone_isolated_from_original_validate(self):
+        clone = self.original.clone()
+        child = clone.child
+        self.original.child.name = 'changed'
+        self.original.validate(errors=[])
+        assert clone.child is child
+        assert child.name == 'child'
+
+    def test_clone_hash(self):
+        hash(self.original)
+        clone = self.original.clone()
+        assert hash(clone) == hash(self.original)
+        self.original.child.name = 'changed'
+        assert hash(self.original) != hash(clone)
+        clone.child.name = 'changed'
+        assert hash(self.original) == hash(clone)
+
+    def test_clone_validate(self):
+        clone = self.original.clone()
+        clone.count = '7'
+        errors = []
+        clone.validate(errors=errors)
+        assert not errors
+        assert clone.count == 7
+        assert self.original.count == 0
+
+
+class TestStructuralHash():
+    @classmethod
+    def setup_class(cls):
+        parent = HierarchicalSequenceModel.gen_parent_min_dict()
+        parent['child'] = HierarchicalSequenceModel.gen_child_min_dict()
+        cls.parent_dict = parent
+
+    def setup_method(self, method):
+        self.inst1 = HierarchicalSequenceModel.from_dict(self.parent_dict)
+        self.inst2 = HierarchicalSequenceModel.from_dict(self.parent_dict)
+
+    def test_equal(self):
+        assert self.inst1 == self.inst2
+        assert hash(self.inst1) == hash(self.inst2)
+
+    def test_set(self):
+        assert len(set([self.inst1, self.inst2, self.inst1.clone()])) == 1
+
+    def test_hash_cached(self):
+        value = hash(self.inst1)
+        assert self.inst1._hash_cache == value
+        assert self.inst1.busRef._hash_cache is not None
+
+    def test_other_write_keeps_cache(self):
+        value = hash(self.inst1)
+        self.inst2.name = 'other'
+        assert self.inst1._hash_cache == value
+
+    def test_nested_write_invalidates_parent(self):
+        value = hash(self.inst1)
+        self.inst1.busRef.version = 'v2.0'
+        assert self.inst1._hash_cache is None
+        assert hash(self.inst1) != value
+
+    def test_mutation_invalidates(self):
+        hash(self.inst1)
+        self.inst2.busRef.version = 'v2.0'
+        assert self.inst1 != self.inst2
+        assert hash(self.inst1) != hash(self.inst2)
+
+    def test_different_class(self):
+        assert self.inst1.busRef != self.inst1.child
+
+
+class TestPickle():
+    @classmethod
+    def setup_class(cls):
+        tests_path = os.path.split(os.path.abspath(__file__))[0]
+        fn = os.path.join(tests_path, 'abstractDefinition.json')
+        with open(fn) as ad_jfile:
+            d = json.load(ad_jfile)
+        cls.inst = AbstractDefinition()
+        cls.inst.from_xml(d, name_spaces=name_spaces)
+        cls.inst.validate(errors=[])
+
+    def test_round_trip(self):
+        restored = pickle.loads(pickle.dumps(self.inst))
+        assert restored == self.inst
+        assert restored.serialize() == self.inst.serialize()
+        assert restored._data_sequence == self.inst._data_sequence
+
+    def test_attribute_model_fields_shared(self):
+        restored = pickle.loads(pickle.dumps(self.inst))
+        assert restored.busType._clsfields is self.inst.busType._clsfields
+
+    def test_compact(self):
+        default = pickle.dumps(self.inst.__dict__)
+        assert len(pickle.dumps(self.inst)) < len(default)
+
+    def test_no_init(self, monkeypatch):
+        data = pickle.dumps(self.inst)
+
+        def fail(instance):
+            raise AssertionError('__init__ called')
+        monkeypatch.setattr(AbstractDefinition, '__init__', fail)
+        pickle.loads(data)
+
+
+class TestFingerprint():
+    @staticmethod
+    def define(max_value=100, size_min=1):
+        class Leaf(AttributeModel):
+            size = IntegerField(min=size_min)
+
+        class Root(SequenceModel):
+            name = CharField()
+            value = FloatField(max=max_value)
+            leaf = ModelField(Leaf)
+
+            class Meta:
+                sequence = [
+                    SequenceElement('name', min_occurs=1),
+                    Choice(options=[SequenceElement('value'),
+                                    SequenceElement('leaf')]),
+                ]
+        return Root
+
+    def test_stable(self):
+        assert self.define().fingerprint == self.define().fingerprint
+
+    def test_memoized(self):
+        cls = self.define()
+        assert cls.fingerprint == cls.__dict__['_fingerprint']
+
+    def test_field_parameter(self):
+        assert self.define().fingerprint != self.define(max_value=99).\
+            fingerprint
+
+    def test_nested_model(self):
+        assert self.define().fingerprint != self.define(size_min=0).\
+            fingerprint
+
+    def test_instances_do_not_change_fingerprint(self):
+        cls = self.define()
+        fingerprint = cls.fingerprint
+        cls.from_dict(dict(name='x', leaf={'@size': '2'}), errors=[])
+        assert self.define().fingerprint == fingerprint
+
+    def test_validation_does_not_change_fingerprint(self):
+        cls = self.define()
+        fingerprint = cls.fingerprint
+        errors = []
+        cls.from_dict(dict(name='x', value='1.5'), errors=errors)
+        assert errors == []
+        del cls._fingerprint
+        assert cls.fingerprint == fingerprint
+
+    def test_not_inherited(self):
+        class Extended(AbstractDefinition):
+            pass
+        assert Extended.fingerprint != AbstractDefinition.fingerprint
+
+    def test_recursive(self):
+        class Node(SequenceModel):
+            name = CharField()
+
+        Node._clsfields['child'] = ModelField(Node)
+        assert len(Node.fingerprint) == 40
+
+
+class TestLoad(object):
+    @classmethod
+    def setup_class(cls):
+        class Component2009(SequenceModel):
+            name = CharField()
+
+            class Meta:
+                sequence = [SequenceElement('name', min_occurs=1)]
+                name_space = 'http://example.com/component/2009'
+                root_tag = 'component'
+
+        class Component2014(SequenceModel):
+            name = CharField()
+            version = CharField()
+
+            class Meta:
+                sequence = [SequenceElement('name', min_occurs=1),
+                            SequenceElement('version', min_occurs=1)]
+                name_space = 'http://example.com/component/2014'
+                root_tag = 'component'
+
+        cls.classes = Component2009, Component2014
+
+    def test_registry(self):
+        assert get_root_model('http://example.com/component/2009',
+                              'component') is self.classes[0]
+        assert get_root_model('http://example.com/component', 'x') is None
+
+    def test_prefix(self):
+        raw = {'c:component': {
+            '@xmlns:c': 'http://example.com/component/2014',
+            'c:name': 'uart', 'c:version': '1.0'}}
+        errors = []
+        inst = load(raw, errors=errors)
+        assert isinstance(inst, self.classes[1])
+        assert errors == []
+        assert inst.version == '1.0'
+
+    def test_default_name_space(self):
+        raw = {'component': {'@xmlns': 'http://example.com/component/2009',
+                             'name': 'uart'}}
+        inst = load(raw)
+        assert isinstance(inst, self.classes[0])
+        assert inst.name == 'uart'
+
+    def test_errors(self):
+        raw = {'component': {'@xmlns': 'http://example.com/component/2014',
+                             'name': 'uart'}}
+        errors = []
+        load(raw, errors=errors)
+        assert len(errors) == 1
+
+    def test_unknown_root(self):
+        with pytest.raises(ValidationException):
+            load({'component': {'name': 'uart'}})
+
+    def test_abstract_definition(self):
+        tests_path = os.path.split(os.path.abspath(__file__))[0]
+        fn = os.path.join(tests_path, 'abstractDefinition.json')
+        with open(fn) as ad_jfile:
+            d = json.load(ad_jfile)
+        errors = []
+        inst = load(d, errors=errors)
+        assert isinstance(inst, AbstractDefinition)
+        assert errors == []
+        assert inst.ports.port[1].logicalName == 'lo2'
+
+
+def test_error_messages_lazy():
+    class Lazy(SequenceModel):
+        name = CharField()
+        size = IntegerField(min=0)
+
+        class Meta:
+            sequence = [SequenceElement('name', min_occurs=1),
+                        SequenceElement('size')]
+
+    logger = logging.getLogger('xmodels.models')
+    logger.disabled = True
+    try:
+        errors = []
+        instance = Lazy()
+        instance.populate({'size': '-1'}, errors=errors)
+        instance.validate(errors=errors)
+    finally:
+        logger.disabled = False
+    assert [error.msg._text for error in errors] == [None, None]
+    assert [error.path for error in errors] == ['Lazy', 'Lazy']
+    assert errors[0].msg == 'Expecting value greater than 0'
+    assert errors[1].msg == 'Missing required key: name '
+
+
+class TestClarkNames(object):
+    @classmethod
+    def setup_class(cls):
+        tests_path = os.path.split(os.path.abspath(__file__))[0]
+        fn = os.path.join(tests_path, 'abstractDefinition.json')
+        with open(fn) as ad_jfile:
+            cls.text = ad_jfile.read()
+
+    def test_to_clark(self):
+        raw = {'a:root': {'@xmlns:a': 'urn:a', '@xmlns': 'urn:d',
+                          '@a:id': '1', '@local': '2', '#text': 't',
+                          'child': [{'a:x': '3'}, {'{urn:b}y': '4'}]}}
+        assert to_clark(raw) == {'{urn:a}root': {
+            '@{urn:a}id': '1', '@local': '2', '#text': 't',
+            '{urn:d}child': [{'{urn:a}x': '3'}, {'{urn:b}y': '4'}]}}
+
+    def test_prefix_independent(self):
+        expected = load(json.loads(self.text))
+        renamed = self.text.replace('spirit:', 'ipx:').replace(
+            'xmlns:spirit', 'xmlns:ipx')
+        errors = []
+        inst = load(json.loads(renamed), clark_names=True, errors=errors)
+        assert errors == []
+        assert inst == expected
+
+    def test_single_source_map(self):
+        renamed = self.text.replace('spirit:', 'ipx:').replace(
+            'xmlns:spirit', 'xmlns:ipx')
+        before = set(LibraryRef._meta.source_maps)
+        for text in self.text, renamed:
+            load(json.loads(text), clark_names=True)
+        assert set(LibraryRef._meta.source_maps) - before <= set(['clark'])
+        assert 'clark' in LibraryRef._meta.source_maps
+
+    def test_serialize(self):
+        inst = load(json.loads(self.text), clark_names=True)
+        result = inst.serialize(clark_names=True)
+        assert result['{%s}name' % SPIRIT_NS] == 'absdef'
+        assert result['{%s}busType' % SPIRIT_NS]['@{%s}vendor' %
+                                                 SPIRIT_NS] == 'Mds'
+
+
+class TestView(object):
+    @classmethod
+    def setup_class(cls):
+        tests_path = os.path.split(os.path.abspath(__file__))[0]
+        fn = os.path.join(tests_path, 'abstractDefinition.json')
+        with open(fn) as ad_jfile:
+            cls.raw = json.load(ad_jfile)
+        cls.root = cls.raw['spirit:abstractionDefinition']
+
+    def view(self):
+        return AbstractDefinition.view(self.root, name_spaces=name_spaces)
+
+    def test_no_copy(self):
+        inst = self.view()
+        assert inst.name == 'absdef'
+        assert inst._data == {}
+        assert inst._extra == {}
+
+    def test_child_views(self):
+        inst = self.view()
+        port = inst.ports.port[1]
+        assert port._raw is self.root['spirit:ports']['spirit:port'][1]
+        assert port.logicalName == 'lo2'
+        assert inst.ports is inst.ports
+        assert inst.busType.vendor == 'Mds'
+
+    def test_write_overlay(self):
+        inst = self.view()
+        inst.name = 'other'
+        assert inst.name == 'other'
+        assert self.root['spirit:name'] == 'absdef'
+
+    def test_validate(self):
+        errors = []
+        inst = self.view()
+        inst.validate(errors=errors)
+        assert [error.msg for error in errors] == [
+            'Found extra attribute fields: @xmlns:spirit,@xmlns:accellera,'
+            '@xmlns:xsi,@xmlns:accellera-power,@xsi:schemaLocation']
+        assert inst._data_sequence == ['vendor', 'library', 'name',
+                                       'version', 'busType', 'ports']
+
+    def test_validate_errors(self):
+        class Item(SequenceModel):
+            name = CharField()
+            size = IntegerField(min=0)
+
+            class Meta:
+                sequence = [SequenceElement('name', min_occurs=1),
+                            SequenceElement('size')]
+
+        errors = []
+        raw = {'size': '-1', 'other': 'x'}
+        inst = Item.view(raw)
+        inst.validate(errors=errors)
+        assert len(errors) == 3
+        assert inst.size == '-1'
+        assert raw == {'size': '-1', 'other': 'x'}
+
+    def test_serialize(self):
+        inst = self.view()
+        inst.validate(errors=[])
+        expected = AbstractDefinition()
+        expected.populate(self.root, name_spaces=name_spaces)
+        expected.validate(errors=[])
+        assert pickle.loads(pickle.dumps(inst)).name == 'absdef'
+        assert inst.serialize() == expected.serialize()
+
+    def test_serialize_converted(self):
+        class Flags(Model):
+            flag = BooleanField()
+            n = IntegerField()
+
+        raw = {'flag': 'false', 'n': ' 5'}
+        inst = Flags.view(raw)
+        errors = []
+        inst.validate(errors=errors)
+        assert errors == []
+        expected = Flags.from_dict(raw)
+        assert inst.serialize() == expected.serialize() == \
+            {'flag': 'false', 'n': 5}
+        assert not inst._validated
+        assert inst.serialize(trusted=True) == expected.serialize()
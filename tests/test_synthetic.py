@@ -0,0 +1,131 @@
+import xml.dom.minidom
+
+import pytest
+
+from tests.definitions import AbstractDefinition, ChildModel, \
+    HierarchicalSequenceModel, LoadConstraint, Port, name_spaces
+from xmodels import Model, ModelCollectionField
+from xmodels.constraints import ID, IDREF, Stores, match_refs
+from xmodels.fields import AttributeField, RegexField
+from xmodels.synthetic import DocumentGenerator, generate, to_xml
+
+
+class Item(Model):
+    id = AttributeField(ID())
+    ref = AttributeField(IDREF())
+
+
+class Items(Model):
+    item = ModelCollectionField(Item)
+
+
+class Codes(Model):
+    year = RegexField(regex=r'^[0-9]{4}$')
+    code = AttributeField(RegexField(regex=r'^(AB|CD)-\d{2}[^x]?$'))
+
+
+def count_ports(raw):
+    return len(raw['spirit:ports']['spirit:port'])
+
+
+def test_valid_documents():
+    for seed in range(10):
+        for cls, spaces in [(AbstractDefinition, name_spaces),
+                            (HierarchicalSequenceModel, None),
+                            (Port, name_spaces), (LoadConstraint, None)]:
+            raw = generate(cls, items=2, depth=4, optional=0.5, seed=seed,
+                           name_spaces=spaces)
+            errors = []
+            cls.from_dict(raw, name_spaces=spaces, errors=errors)
+            assert errors == [], raw
+
+
+def test_required_fields():
+    raw = generate(ChildModel, optional=0)
+    assert sorted(raw) == ['@alignment', 'name']
+    assert raw['@alignment'] in ('serial', 'parallel')
+    raw = generate(HierarchicalSequenceModel, optional=0)
+    assert set(['name', 'busRef']) <= set(raw)
+    assert sorted(raw['busRef']) == ['@library', '@name', '@vendor',
+                                     '@version']
+    assert len(set(raw) & set(['timingConstraint', 'driveConstraint',
+                               'loadConstraint'])) >= 1
+
+
+def test_size():
+    raw = generate(AbstractDefinition, items=50, name_spaces=name_spaces)
+    assert count_ports(raw) == 50
+    raw = generate(AbstractDefinition, items=5, depth=0, optional=0,
+                   name_spaces=name_spaces)
+    assert count_ports(raw) == 1
+    assert 'spirit:extends' not in raw
+
+
+def test_seed():
+    first = generate(HierarchicalSequenceModel, optional=0.5, seed=7)
+    assert generate(HierarchicalSequenceModel, optional=0.5, seed=7) == first
+
+
+def test_references():
+    raw = generate(Items, items=20, references=1)
+    ids = set(item['@id'] for item in raw['item'])
+    assert len(ids) == 20
+    assert set(item['@ref'] for item in raw['item']) <= ids
+    stores = Stores()
+    errors = []
+    Items.from_dict(raw, stores=stores, errors=errors)
+    assert errors == []
+    match_refs(stores)
+    raw = generate(Items, items=20, references=0)
+    assert not any('@ref' in item for item in raw['item'])
+
+
+def test_regex():
+    for seed in range(10):
+        raw = generate(Codes, seed=seed)
+        errors = []
+        Codes.from_dict(raw, errors=errors)
+        assert errors == [], raw
+
+
+def test_unsupported_regex():
+    class Repeated(Model):
+        pair = RegexField(regex=r'^(a)\1$')
+
+    with pytest.raises(ValueError):
+        generate(Repeated)
+
+
+def test_invalid():
+    generator = DocumentGenerator(items=20, invalid=0.3, seed=2)
+    raw = generator.generate(Items)
+    errors = []
+    Items.from_dict(raw, errors=errors)
+    assert generator.injected > 0
+    assert len(errors) == generator.injected
+
+
+def test_document_to_xml():
+    generator = DocumentGenerator(items=2, name_spaces=name_spaces)
+    document = generator.document(AbstractDefinition)
+    root = document['spirit:abstractionDefinition']
+    assert root['@xmlns:spirit'] == AbstractDefinition._meta.name_space
+    text = to_xml(document)
+    errors = []
+    instance = AbstractDefinition()
+    instance.from_xml(document, name_spaces={}, errors=errors)
+    assert errors == []
+    dom = xml.dom.minidom.parseString(text)
+    assert dom.documentElement.tagName == 'spirit:abstractionDefinition'
+    ports = dom.getElementsByTagName('spirit:port')
+    assert len(ports) == 2
+    bus_type = dom.getElementsByTagName('spirit:busType')[0]
+    assert bus_type.getAttribute('spirit:vendor') == root[
+        'spirit:busType']['@spirit:vendor']
+
+
+def test_to_xml_escape():
+    text = to_xml({'a': {'@b': '"<&>"', '#text': 'x < y', 'c': [1, None]}})
+    dom = xml.dom.minidom.parseString(text)
+    assert dom.documentElement.getAttribute('b') == '"<&>"'
+    assert len(dom.getElementsByTagName('c')) == 2
@@ -5,4 +5,4 @@ from .fields import CharField, FieldCollectionField, IntegerField, ModelField, \
     ValidationException, DateField, TimeField, EnumField, NonNegativeFloat, \
     NonNegativeInteger, Token, NCName, Language, NMTOKEN, PositiveInteger, \
     NegativeInteger, Name
-from .models import Model, AttributeModel, SequenceModel
+from .models import Model, AttributeModel, SequenceModel, load
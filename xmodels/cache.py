@@ -0,0 +1,184 @@
+"""
+On-disk cache for validation results. Entries are keyed on the content hash
+of an input document, a fingerprint of the model class it was validated
+against and the options used to load it, so unchanged inputs are answered
+without parsing them again.
+
+The options are the parser and the keyword arguments of
+:meth:`ValidationCache.validate`. Objects are described by their class and
+functions by their qualified name; pass namespace to tell apart parsers or
+options that are not distinguished by their names, e.g. lambdas.
+
+Entries are written to a temporary file and renamed into place, so several
+processes can share one cache directory: readers either see a complete entry
+or none at all. The total size of the directory is bounded; the least
+recently used entries are evicted first.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import namedtuple
+
+from six import integer_types, string_types, text_type
+
+from . import __version__
+from .models import SequenceModel
+
+
+CacheEntry = namedtuple('CacheEntry', 'valid errors instance'.split())
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _describe(value):
+    """Returns a string describing an option value that does not depend on
+    object identities."""
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join(sorted('%s: %s' % (_describe(key),
+                                                     _describe(item))
+                                         for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return '[%s]' % ', '.join(_describe(item) for item in value)
+    if value is None or isinstance(value, (bool, float) + integer_types +
+                                   string_types):
+        return repr(value)
+    if not hasattr(value, '__name__'):
+        value = type(value)
+    return '%s.%s' % (getattr(value, '__module__', ''),
+                      getattr(value, '__qualname__', value.__name__))
+
+
+class ValidationCache(object):
+    """
+    Cache of validation outcomes stored in directory.
+
+    :param str directory: cache directory, created if it does not exist
+    :param int max_size: maximum total size of all entries in bytes
+    :param bool store_instances: also store the validated model instance
+    """
+    suffix = '.xvc'
+
+    def __init__(self, directory, max_size=64 * 1024 * 1024,
+                 store_instances=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.store_instances = store_instances
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+
+    def key(self, content, model_class, **options):
+        if isinstance(content, text_type):
+            content = content.encode('utf-8')
+        digest = hashlib.sha256(content)
+        digest.update(model_class.fingerprint.encode('ascii'))
+        digest.update(__version__.encode('ascii'))
+        digest.update(_describe(options).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, content, model_class, **options):
+        """Returns the cached CacheEntry for content loaded with options, the
+        keyword arguments passed to validate, or None."""
+        return self._get(self.key(content, model_class, **options))
+
+    def _get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                entry = pickle.load(cache_file)
+            os.utime(path, None)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if not isinstance(entry, CacheEntry):
+            return None
+        return entry
+
+    def put(self, content, model_class, errors, instance=None, **options):
+        return self._put(self.key(content, model_class, **options), errors,
+                         instance)
+
+    def _put(self, key, errors, instance):
+        if not self.store_instances:
+            instance = None
+        entry = CacheEntry(valid=not errors, errors=list(errors),
+                           instance=instance)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                pickle.dump(entry, tmp_file, pickle.HIGHEST_PROTOCOL)
+            _replace(tmp_path, path)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+        return entry
+
+    def validate(self, content, model_class, parse, namespace=None,
+                 **kwargs):
+        """
+        Returns the CacheEntry for content. On a cache miss content is
+        converted to a dict with parse, e.g. xmltodict.parse, populated into
+        a new model_class instance and validated. kwargs are passed on to
+        from_xml/populate and validate. parse, namespace and kwargs are part
+        of the cache key.
+        """
+        kwargs.pop('errors', None)
+        # from_xml adds the prefixes of the document to name_spaces.
+        key = self.key(content, model_class, parse=parse,
+                       namespace=namespace, **kwargs)
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+        raw_data = parse(content)
+        instance = model_class()
+        if isinstance(instance, SequenceModel):
+            instance.from_xml(raw_data, **kwargs)
+        else:
+            instance.populate(raw_data, **kwargs)
+        errors = []
+        instance.validate(errors=errors, **kwargs)
+        return self._put(key, errors, instance)
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits into
+        max_size."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+        entries.sort()
+        for mtime, size, name in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                # Removed concurrently by another process.
+                pass
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,364 @@
+"""
+Ahead-of-time generation of specialized populate and validate methods.
+
+:func:`generate_source` emits Python source for a model class in which the
+field dispatch of populate, the per field validation and the
+Meta.sequence/Choice checks of SequenceModel.validate are unrolled into
+straight-line code: populate looks up the source of every field in the data
+instead of dispatching on the key of every item, fields checked by their
+facets alone are checked without copying the keyword arguments and the
+bookkeeping of the generic methods is inlined. Fields, SequenceElements and
+Choices are bound as constants. :func:`compile_model` executes the source
+and installs the functions on the class as _populate and _validate, which
+populate and validate call with a :class:`~xmodels.context.ValidationContext`.
+The schema definitions stay unchanged::
+
+    from xmodels.codegen import compile_model
+
+    compile_model(AbstractDefinition)
+
+Methods overridden by a model class itself are not replaced. Views, see
+:meth:`~xmodels.models.Model.view`, are validated by the generic methods.
+"""
+import linecache
+import logging
+
+from .constraints import Stores
+from .fields import AttributeField, BaseField, RequiredAttribute, \
+    WrappedObjectField, ValidationException, _check_facets, _function, \
+    _implements
+from .models import Model, SequenceModel, ModelType, SequenceElement, \
+    Choice, MsgRecord, _Deferred, _qualified_name
+from .utils import Message, ModelPath
+
+logger = logging.getLogger(__name__)
+
+_INDENT = '    '
+# marks a field without a value in the data passed to populate
+_MISSING = object()
+
+
+class _Writer(object):
+
+    def __init__(self):
+        self.lines = []
+        self.level = 0
+
+    def __call__(self, line=''):
+        self.lines.append(_INDENT * self.level + line if line else '')
+
+    def indent(self):
+        self.level += 1
+
+    def dedent(self):
+        self.level -= 1
+
+
+def _class_fields(model_class):
+    # AttributeModel wraps its fields per instance, _blank returns the table
+    # an instance would use.
+    return model_class._blank()._clsfields
+
+
+def _generic(model_class, name):
+    """Returns the implementation of name, _populate or _validate, that
+    model_class uses unless a generated one is installed, or None if the
+    class overrides it or the public method populate or validate."""
+    base = SequenceModel if issubclass(model_class, SequenceModel) else Model
+    public = name.lstrip('_')
+    if _function(getattr(model_class, public)) is not \
+            _function(getattr(base, public)):
+        return None
+    method = _function(getattr(model_class, name))
+    if getattr(method, '_generated', False):
+        return method
+    if method is _function(getattr(base, name)):
+        return method
+
+
+def _check_field(field):
+    """Returns the field whose check validates field without keyword
+    arguments, unwrapping attribute fields, or None if the check needs
+    them."""
+    while type(field) in (AttributeField, RequiredAttribute):
+        field = field.field_instance
+    cls = type(field)
+    if _function(cls.check) is _function(BaseField.check) and \
+            _implements(cls, '_check', 'validate') and \
+            _function(cls._check) is _check_facets:
+        return field
+
+
+def _write_before_write(write):
+    # Model._before_write for instances that are usually neither shared
+    # nor hashed.
+    write('self_dict = self.__dict__')
+    write("if self_dict.get('_tables') is not None:")
+    write(_INDENT + 'self._own_data()')
+    write("self_dict.pop('_validated', None)")
+    write("if self_dict.get('_hash_cache') is not None:")
+    write(_INDENT + 'self._invalidate_hash()')
+
+
+def _write_populate(write, fields, constants):
+    write('def _populate(self, data, context):')
+    write.indent()
+    write('if self.__class__ is not model_class:')
+    write(_INDENT + 'return generic_populate(self, data, context)')
+    _write_before_write(write)
+    write("string_intern = context.get('string_intern')")
+    write("self._gen_key_to_from_source(context.get('name_spaces'), "
+          "context.get('clark_names'))")
+    write('meta = self._meta')
+    write('key_to_source = meta.key_to_source')
+    write('values = self._data')
+    write('non_empty_fields = self._non_empty_fields')
+    write('found = 0')
+    # One lookup of the source of every field in data instead of a
+    # dispatch on the key of every item of data.
+    for key, field in fields.items():
+        const = constants[key]
+        write('value = data.get(key_to_source[%r], MISSING)' % key)
+        write('if value is not MISSING:')
+        write.indent()
+        write('found += 1')
+        accept_none = getattr(field, 'accept_none', None)
+        if accept_none is True:
+            write('non_empty_fields.add(%r)' % key)
+        elif accept_none is False:
+            write('if value is not None:')
+            write(_INDENT + 'non_empty_fields.add(%r)' % key)
+        else:
+            write('if value is not None or %s.accept_none:' % const)
+            write(_INDENT + 'non_empty_fields.add(%r)' % key)
+        if isinstance(field, WrappedObjectField):
+            write('values[%r] = %s._populate_object(value, context)' %
+                  (key, const))
+        else:
+            write('if string_intern is not None:')
+            write(_INDENT + 'value = string_intern.intern(value)')
+            write('values[%r] = value' % key)
+        write.dedent()
+    # A source shared by several fields is counted once per field, the data
+    # is always scanned for extra items then.
+    sources = [field.get_source(key) for key, field in fields.items()]
+    counted = len(set(sources)) == len(sources)
+    if counted:
+        write('if found != len(data):')
+        write.indent()
+    write('source_to_key = meta.source_to_key')
+    write('extra = self._extra')
+    write('for name, value in data.items():')
+    write.indent()
+    write('if name not in source_to_key:')
+    write.indent()
+    write('if string_intern is not None:')
+    write(_INDENT + 'name = string_intern.intern(name)')
+    write('extra[name] = value')
+    write.dedent()
+    write.dedent()
+    if counted:
+        write.dedent()
+    write.dedent()
+
+
+def _write_fields_validation(write, fields, field_constants):
+    write('values = self._data')
+    write("string_intern = context.get('string_intern')")
+    write('kwargs = context.kwargs')
+    for key, field in fields.items():
+        write('data = values.get(%r)' % key)
+        write('if data is not None:')
+        write.indent()
+        if isinstance(field, WrappedObjectField):
+            write('values[%r] = %s._validate_object(data, context)' %
+                  (key, field_constants[key]))
+            write.dedent()
+            continue
+        check_const = field_constants.get(('check', key))
+        if check_const is not None:
+            # Looked up on every call, the field compiles its facets again
+            # after one of them is changed.
+            write('ok, value = %s.check(data)' % check_const)
+        else:
+            write('ok, value = %s.check(data, **kwargs)' %
+                  field_constants[key])
+        write('if ok:')
+        write.indent()
+        write('if string_intern is not None:')
+        write(_INDENT + 'value = string_intern.intern_value(value)')
+        write('values[%r] = value' % key)
+        write.dedent()
+        write('else:')
+        write.indent()
+        write('msg_rec = MsgRecord(path=self_path, field=%r, msg=value)' %
+              key)
+        write('context.error(logger, msg_rec)')
+        write.dedent()
+        write.dedent()
+    write('if self._extra:')
+    write(_INDENT + 'self._validate_extra(context)')
+
+
+def _write_choice(write, choice, const, constants):
+    """Unrolls Choice.match_choice_keys for the matching case. Key sets that
+    match no option are passed to match_choice_keys which reports them."""
+    write('choice_keys = present & %s.all_keys_set' % const)
+    if not choice.required:
+        write('if choice_keys:')
+        write.indent()
+    keyword = 'if'
+    for index, option in enumerate(choice.options):
+        required_keys = choice.required_keys_sets[index]
+        max_keys = required_keys | choice.optional_keys_sets[index]
+        required_const = constants.add(frozenset(required_keys))
+        max_const = constants.add(frozenset(max_keys))
+        write('%s choice_keys >= %s and choice_keys <= %s:' % (
+            keyword, required_const, max_const))
+        keyword = 'elif'
+        if isinstance(option, SequenceElement):
+            write(_INDENT + 'sequence.append(%r)' % option.tag)
+        else:
+            for item in option:
+                write(_INDENT + 'if %r in choice_keys:' % item.tag)
+                write(_INDENT * 2 + 'sequence.append(%r)' % item.tag)
+    write('else:')
+    write(_INDENT + 'sequence.extend(%s._match_choice_keys(choice_keys, '
+          'context) or [])' % const)
+    if not choice.required:
+        write.dedent()
+
+
+def _write_validate(write, model_class, fields, field_constants, constants):
+    write('def _validate(self, context):')
+    write.indent()
+    write('if self.__class__ is not model_class or self._raw is not None:')
+    write(_INDENT + 'return generic_validate(self, context)')
+    write('error_count = len(context.errors)')
+    write('path = context.path')
+    _write_before_write(write)
+    write('self_path = self_dict[\'_path\'] = ModelPath(path, %r, '
+          'context.instance_index)' % model_class.__name__)
+    write('context.push(self_path)')
+    if not issubclass(model_class, SequenceModel):
+        _write_fields_validation(write, fields, field_constants)
+        write('context.pop()')
+        write("self_dict['_validated'] = len(context.errors) == error_count")
+        write('return self')
+        write.dedent()
+        return
+    if model_class._meta.initial is not None:
+        write('if context.stores is None:')
+        write(_INDENT + 'context.stores = Stores()')
+        write('self._meta.initial.add_keys(path=self_path, '
+              'stores=context.stores)')
+    _write_fields_validation(write, fields, field_constants)
+    elements = [key for key, field in fields.items() if not field.isAttribute]
+    write('non_empty_fields = self._non_empty_fields')
+    write('present = set(key for key in %s' % constants.add(tuple(elements)))
+    write('              if key in non_empty_fields and '
+          'values[key] is not None)')
+    write('sequence = []')
+    for item in model_class._meta.sequence or []:
+        if isinstance(item, SequenceElement):
+            write('if %r in present:' % item.tag)
+            write(_INDENT + 'sequence.append(%r)' % item.tag)
+            if item.required:
+                write('else:')
+                write.indent()
+                write('msg = Message(%r, (path,))' %
+                      ('Missing required key: %s %%s' % item.tag))
+                write('msg_rec = MsgRecord(path=self_path, field=%r, '
+                      'msg=msg)' % item.tag)
+                write('context.error(logger, msg_rec)')
+                write.dedent()
+        elif isinstance(item, Choice):
+            const = constants.add(item)
+            _write_choice(write, item, const, constants)
+    write('extra_tags = [tag for tag in present if tag not in sequence]')
+    write('if extra_tags:')
+    write.indent()
+    write('msg = Message("Could not match tag(s): %s", '
+          '_Deferred(\', \'.join, extra_tags))')
+    write("msg_rec = MsgRecord(path=self_path, field='_extra', msg=msg)")
+    write('context.error(logger, msg_rec)')
+    write.dedent()
+    write("self_dict['_data_sequence'] = sequence")
+    write('context.pop()')
+    write("self_dict['_validated'] = len(context.errors) == error_count")
+    write('return self')
+    write.dedent()
+
+
+class _Constants(dict):
+    """Name space of the generated code, maps constant names to objects."""
+
+    def __init__(self):
+        super(_Constants, self).__init__(
+            Stores=Stores, ValidationException=ValidationException,
+            MsgRecord=MsgRecord, Message=Message, ModelPath=ModelPath,
+            _Deferred=_Deferred, logger=logger, MISSING=_MISSING,
+            model_class=None, generic_populate=None, generic_validate=None)
+        self.count = 0
+
+    def add(self, value):
+        name = 'C%d' % self.count
+        self.count += 1
+        self[name] = value
+        return name
+
+
+def _generate(model_class):
+    fields = _class_fields(model_class)
+    constants = _Constants()
+    field_constants = dict((key, constants.add(field))
+                           for key, field in fields.items())
+    for key, field in fields.items():
+        check_field = _check_field(field)
+        if check_field is not None:
+            field_constants['check', key] = constants.add(check_field)
+    write = _Writer()
+    write('# Generated by xmodels.codegen for %s' % _qualified_name(
+        model_class))
+    _write_populate(write, fields, field_constants)
+    write()
+    _write_validate(write, model_class, fields, field_constants, constants)
+    return '\n'.join(write.lines) + '\n', constants
+
+
+def generate_source(model_class):
+    """Returns the Python source of the specialized populate and validate
+    functions for model_class. Objects referenced by the source are named
+    C0, C1, ..."""
+    return _generate(model_class)[0]
+
+
+def compile_model(model_class, recursive=True):
+    """Compiles specialized populate and validate methods for model_class
+    and installs them on the class. With recursive, model classes wrapped by
+    ModelField and ModelCollectionField are compiled as well.
+
+    :returns: model_class
+    """
+    if model_class.__dict__.get('_compiled'):
+        return model_class
+    model_class._compiled = True
+    source, name_space = _generate(model_class)
+    filename = '<xmodels.codegen %s>' % _qualified_name(model_class)
+    linecache.cache[filename] = (len(source), None,
+                                 source.splitlines(True), filename)
+    name_space.update(model_class=model_class,
+                      generic_populate=_generic(model_class, '_populate'),
+                      generic_validate=_generic(model_class, '_validate'))
+    exec(compile(source, filename, 'exec'), name_space)
+    for name in ('populate', 'validate'):
+        if name_space['generic_' + name] is not None:
+            function = name_space['_' + name]
+            function._generated = True
+            setattr(model_class, '_' + name, function)
+    if recursive:
+        for field in _class_fields(model_class).values():
+            wrapped = getattr(field, '_wrapped_class', None)
+            if isinstance(wrapped, ModelType):
+                compile_model(wrapped, recursive)
+    return model_class
@@ -0,0 +1,154 @@
+"""
+Column-oriented export of model instances, for example the items of a
+ModelCollectionField. :func:`to_columns` stores every field of a sequence of
+instances in one column:
+
+* IntegerField, FloatField and BooleanField values in an ``array.array`` of
+  machine integers, doubles or bytes,
+* all other values dictionary encoded: an ``array.array`` of integer codes
+  into a list of distinct values.
+
+Aggregates can then be computed on the arrays instead of the instances::
+
+    columns = to_columns(suite.testcase, fields=['name', 'time'])
+    total = sum(columns['time'].values)
+
+With NumPy installed, :meth:`to_numpy` of a column returns an array sharing
+the column buffer.
+"""
+from array import array
+from collections import OrderedDict
+
+from .fields import AttributeField, BooleanField, FloatField, IntegerField, \
+    WrappedObjectField, INT_TYPECODE, _numpy
+
+
+def _require_numpy():
+    numpy = _numpy()
+    if numpy is None:
+        raise ImportError('to_numpy requires NumPy')
+    return numpy
+
+
+class NumericColumn(object):
+    """
+    Column of numbers in an ``array.array``. Missing values are stored as 0
+    and recorded in the optional byte array valid.
+    """
+
+    def __init__(self, typecode, convert):
+        self.values = array(typecode)
+        self.valid = None
+        self.convert = convert
+
+    def append(self, value):
+        if value is None:
+            if self.valid is None:
+                self.valid = array('B', [1]) * len(self.values)
+            self.values.append(0)
+            self.valid.append(0)
+            return
+        self.values.append(self.convert(value))
+        if self.valid is not None:
+            self.valid.append(1)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if self.valid is not None and not self.valid[index]:
+            return None
+        return self.values[index]
+
+    def to_numpy(self):
+        """Returns the values as NumPy array, masked if values are missing.
+        The array shares the buffer of the column."""
+        numpy = _require_numpy()
+        values = numpy.frombuffer(self.values, dtype=self.values.typecode)
+        if self.valid is None:
+            return values
+        valid = numpy.frombuffer(self.valid, dtype='B')
+        return numpy.ma.masked_array(values, mask=valid == 0)
+
+
+class DictionaryColumn(object):
+    """
+    Dictionary encoded column. codes holds for every row the index of its
+    value in dictionary, -1 for a missing value. Unhashable values are
+    encoded by their repr.
+    """
+
+    def __init__(self):
+        self.codes = array('i')
+        self.dictionary = []
+        self._index = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            return
+        try:
+            code = self._index.get(value)
+        except TypeError:
+            value = repr(value)
+            code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        if code < 0:
+            return None
+        return self.dictionary[code]
+
+    def to_numpy(self):
+        """Returns the codes as NumPy array sharing the column buffer."""
+        return _require_numpy().frombuffer(self.codes, dtype='i')
+
+
+def _to_bool(value):
+    return BooleanField().validate(value)
+
+
+def _column_for(field):
+    if isinstance(field, AttributeField):
+        field = field.field_instance
+    if isinstance(field, IntegerField):
+        return NumericColumn(INT_TYPECODE, int)
+    if isinstance(field, FloatField):
+        return NumericColumn('d', float)
+    if isinstance(field, BooleanField):
+        return NumericColumn('B', _to_bool)
+    return DictionaryColumn()
+
+
+def to_columns(models, fields=None):
+    """
+    Exports models, an iterable of instances of one model class, to columns.
+    Instances are read one at a time, so models may be a generator.
+
+    :param models: iterable of model instances
+    :param list fields: keys of the fields to export, default all fields
+        except wrapped models
+    :returns: OrderedDict of {key: column} in fields order
+    """
+    columns = None
+    for model in models:
+        if columns is None:
+            cls_fields = model._clsfields
+            if fields is None:
+                fields = [key for key in model._field_names
+                          if not isinstance(cls_fields[key],
+                                            WrappedObjectField)]
+            columns = OrderedDict((key, _column_for(cls_fields[key]))
+                                  for key in fields)
+        for key, column in columns.items():
+            column.append(getattr(model, key))
+    if columns is None:
+        columns = OrderedDict()
+    return columns
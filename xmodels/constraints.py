@@ -153,6 +153,9 @@ def get_value_path_stores(**kwargs):
 
     stores = kwargs.get('stores')
     path = kwargs.get('path')
+    if path is not None:
+        # paths of model instances are ModelPath objects
+        path = str(path)
     if stores is not None:
         if not isinstance(stores, Stores):
             raise TypeError(messages['store'])
@@ -173,6 +176,7 @@ class InitStores(object):
     )
 
     def add_keys(self, path='', stores=None):
+        path = str(path)
         if self.key_names:
             stores.keyStore.add_key(self.key_names, path)
         if self.unique_names:
@@ -0,0 +1,86 @@
+"""
+State shared by one traversal of a model instance graph.
+
+populate, validate, deserialize, serialize and load of a model create one
+:class:`ValidationContext` from their keyword arguments and pass it to the
+nested models and wrapped fields instead of copying the keyword arguments
+for every instance::
+
+    context = ValidationContext(errors=errors, name_spaces=name_spaces)
+    instance.validate(context=context)
+
+A context passed as keyword argument context is used as is, the other keyword
+arguments are ignored then. push saves and pop restores the stores of
+identity constraints with the path. Keys collected in the stores passed to
+the context are therefore kept, so passing the same context with
+stores=Stores() validates several instances against one set of keys. Stores
+a model creates because none were passed belong to its scope and are
+dropped when its path is popped.
+"""
+
+
+class ValidationContext(object):
+    """
+    Errors list, identity constraint stores, name spaces, path of the current
+    instance and the other options of a traversal. kwargs holds all of them
+    as passed to the field methods; a model pushes its path while its fields
+    are processed and pops it afterwards.
+
+    :param list errors: validation errors are appended, default a new list
+    """
+    __slots__ = ('kwargs', 'errors', '_frames')
+
+    def __init__(self, **kwargs):
+        if kwargs.get('errors') is None:
+            kwargs['errors'] = []
+        self.kwargs = kwargs
+        self.errors = kwargs['errors']
+        self._frames = []
+
+    @classmethod
+    def from_kwargs(cls, kwargs):
+        """Returns kwargs['context'] or a new context for kwargs."""
+        context = kwargs.get('context')
+        if context is None:
+            context = cls(**kwargs)
+        return context
+
+    def get(self, name, default=None):
+        return self.kwargs.get(name, default)
+
+    @property
+    def path(self):
+        return self.kwargs.get('path', '')
+
+    @property
+    def stores(self):
+        return self.kwargs.get('stores')
+
+    @stores.setter
+    def stores(self, stores):
+        self.kwargs['stores'] = stores
+
+    @property
+    def instance_index(self):
+        return self.kwargs.get('instance_index')
+
+    @instance_index.setter
+    def instance_index(self, index):
+        self.kwargs['instance_index'] = index
+
+    def push(self, path):
+        """Makes path the current path. The next pop restores path, stores
+        and instance_index."""
+        kwargs = self.kwargs
+        self._frames.append((kwargs.get('path', ''), kwargs.get('stores'),
+                             kwargs.get('instance_index')))
+        kwargs['path'] = path
+
+    def pop(self):
+        kwargs = self.kwargs
+        kwargs['path'], kwargs['stores'], kwargs['instance_index'] = \
+            self._frames.pop()
+
+    def error(self, logger_inst, message):
+        self.errors.append(message)
+        logger_inst.error(message)
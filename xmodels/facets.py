@@ -0,0 +1,179 @@
+"""
+Compiles the facets of a simple type field into one check function.
+
+A field describes its value space by a base type and xsd facets::
+
+    compile_facets('string', dict(whiteSpace='collapse', maxLength=8),
+                   messages)
+
+returns a function ``check(raw_data, **kwargs)`` with the semantics of
+:meth:`~xmodels.fields.BaseField.check` in which only the checks of the
+given facets remain, each as straight-line code. Fields compile their facets
+on first use and again after a facet attribute is set, see
+:meth:`~xmodels.fields.BaseField._facet_check`.
+
+Base types are 'string', 'integer', 'float' (the raw value is returned, as
+FloatField.validate does) and 'number' (the value is compared as given).
+Supported facets are length, minLength, maxLength, pattern, enumeration,
+minInclusive, maxInclusive, minExclusive, maxExclusive and whiteSpace.
+'strip' selects the CharField default of stripping the value when no
+whiteSpace facet is set, 'whiteSpaceStrict' reports values not in
+whiteSpace normal form instead of normalizing them.
+"""
+import re
+
+from six import string_types
+
+from .utils import Message
+
+FACETS = ('length', 'minLength', 'maxLength', 'pattern', 'enumeration',
+          'minInclusive', 'maxInclusive', 'minExclusive', 'maxExclusive',
+          'whiteSpace')
+BASE_TYPES = ('string', 'integer', 'float', 'number')
+WHITE_SPACE_FACETS = ('preserve', 'replace', 'collapse')
+
+XML_SPACE = ' \t\n\r'
+# match the first character the facet would change
+NOT_REPLACED = re.compile(r'[\t\n\r]')
+NOT_COLLAPSED = re.compile(r'^[ \t\n\r]|[ \t\n\r]$|[\t\n\r]| {2}')
+XML_SPACE_RUN = re.compile(r'[ \t\n\r]+')
+
+# used if the field does not define the message
+DEFAULT_MESSAGES = dict(
+    invalid='Invalid value',
+    whitespace='Whitespace is not normalized.',
+    length='Expecting string of %d characters',
+    tooShort='Expecting string longer than %d characters',
+    tooLong='Expecting string shorter than %d characters',
+    no_match='The input does not match the regex',
+    notIn='Value must be one of: %(items)s (not %(value)r)',
+    tooSmall='Expecting value greater than %d',
+    tooLarge='Expecting value less than %d',
+)
+
+_INDENT = '    '
+_CONVERT = dict(integer='int', float='float')
+
+
+def _write_white_space(lines, facets):
+    facet = facets.get('whiteSpace')
+    strict = facets.get('whiteSpaceStrict')
+    if facet is None:
+        lines.append('value = raw_data.strip()' if facets.get('strip')
+                     else 'value = raw_data')
+        return
+    lines.append('value = raw_data')
+    if facet == 'preserve':
+        return
+    scan = 'NOT_REPLACED' if facet == 'replace' else 'NOT_COLLAPSED'
+    lines.append('if %s.search(value) is not None:' % scan)
+    if not strict:
+        if facet == 'replace':
+            lines.append(_INDENT + "value = NOT_REPLACED.sub(' ', value)")
+        else:
+            lines.append(_INDENT + "value = XML_SPACE_RUN.sub(' ', "
+                                   "value).strip(' ')")
+        return
+    if facet == 'collapse':
+        lines.append(_INDENT + 'value = value.strip(XML_SPACE)')
+        lines.append(_INDENT + 'if NOT_COLLAPSED.search(value) is not None:')
+        lines.append(_INDENT * 2 + "return False, msg('whitespace')")
+    else:
+        lines.append(_INDENT + "return False, msg('whitespace')")
+
+
+def _write_length(lines, facets):
+    checks = [('length', '!=', 'length'), ('minLength', '<', 'tooShort'),
+              ('maxLength', '>', 'tooLong')]
+    checks = [check for check in checks if facets.get(check[0]) is not None]
+    if not checks:
+        return
+    lines.append('size = len(value)')
+    for name, operator, message in checks:
+        lines.append('if size %s %s:' % (operator, name))
+        lines.append(_INDENT + 'return False, Message(msg(%r), %s)' %
+                     (message, name))
+
+
+def _write_range(lines, facets):
+    checks = [('minInclusive', '<', 'tooSmall'),
+              ('minExclusive', '<=', 'tooSmall'),
+              ('maxInclusive', '>', 'tooLarge'),
+              ('maxExclusive', '>=', 'tooLarge')]
+    for name, operator, message in checks:
+        if facets.get(name) is not None:
+            lines.append('if value %s %s:' % (operator, name))
+            lines.append(_INDENT + 'return False, Message(msg(%r), %s)' %
+                         (message, name))
+
+
+def generate_source(base, facets):
+    """Returns the source of the check function for base type and facets."""
+    assert base in BASE_TYPES, 'base needs to be one of %s.' % \
+        ', '.join(BASE_TYPES)
+    lines = []
+    if base == 'string':
+        lines.append('if not isinstance(raw_data, string_types):')
+        lines.append(_INDENT + "return False, msg('invalid')")
+        _write_white_space(lines, facets)
+        _write_length(lines, facets)
+        if facets.get('pattern') is not None:
+            lines.append('if pattern(value) is None:')
+            lines.append(_INDENT + "return False, msg('no_match')")
+    elif base in _CONVERT:
+        lines.append('try:')
+        lines.append(_INDENT + 'value = %s(raw_data)' % _CONVERT[base])
+        lines.append('except ValueError:')
+        lines.append(_INDENT + "return False, msg('invalid')")
+    else:
+        lines.append('value = raw_data')
+    if base != 'string':
+        _write_range(lines, facets)
+    if facets.get('enumeration') is not None:
+        lines.append('if value not in enumeration:')
+        lines.append(_INDENT + "return False, Message(msg('notIn'), dict("
+                               "items=enumeration_items, value=raw_data))")
+    lines.append('return True, %s' % ('raw_data' if base == 'float'
+                                      else 'value'))
+    return 'def check(raw_data, **kwargs):\n%s\n' % '\n'.join(
+        _INDENT + line for line in lines)
+
+
+def compile_facets(base, facets, messages=None):
+    """
+    Returns the check function for base type and facets.
+
+    :param str base: 'string', 'integer', 'float' or 'number'
+    :param dict facets: {facet name: value}, facets set to None are ignored
+    :param dict messages: message templates by message key, looked up when
+        a check fails
+    """
+    white_space = facets.get('whiteSpace')
+    assert white_space is None or white_space in WHITE_SPACE_FACETS, \
+        'whiteSpace needs to be one of %s.' % ', '.join(WHITE_SPACE_FACETS)
+    if messages is None:
+        messages = {}
+
+    def msg(key):
+        return messages.get(key) or DEFAULT_MESSAGES[key]
+
+    pattern = facets.get('pattern')
+    if isinstance(pattern, string_types):
+        pattern = re.compile(pattern)
+    enumeration = facets.get('enumeration')
+    name_space = dict(
+        (name, facets.get(name)) for name in FACETS)
+    name_space.update(
+        string_types=string_types, Message=Message, msg=msg,
+        pattern=pattern.search if pattern is not None else None,
+        enumeration=(frozenset(enumeration) if enumeration is not None
+                     else None),
+        enumeration_items=(', '.join(str(item) for item in enumeration)
+                           if enumeration is not None else None),
+        XML_SPACE=XML_SPACE, NOT_REPLACED=NOT_REPLACED,
+        NOT_COLLAPSED=NOT_COLLAPSED, XML_SPACE_RUN=XML_SPACE_RUN)
+    source = generate_source(base, facets)
+    exec(compile(source, '<xmodels.facets>', 'exec'), name_space)
+    check = name_space['check']
+    check.source = source
+    return check
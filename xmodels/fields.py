@@ -17,25 +17,114 @@ try:
     from collections import OrderedDict
 except ImportError:
     from ordereddict import OrderedDict
+from array import array
 import datetime
 import logging
 import re
 
-from six import string_types
+from six import string_types, integer_types
 
-from .utils import CommonEqualityMixin
+from .context import ValidationContext
+from .facets import compile_facets, DEFAULT_MESSAGES, NOT_COLLAPSED, \
+    NOT_REPLACED, WHITE_SPACE_FACETS, XML_SPACE, XML_SPACE_RUN
 from .iso8601 import ParseError, parse, parse_time, parse_date
+from .utils import CommonEqualityMixin, Message
+
+_NOT_IMPORTED = object()
+# NumPy is imported by _numpy on first use, importing it takes longer than
+# importing xmodels. None disables the vectorized validation.
+numpy = _NOT_IMPORTED
+
+try:
+    array('q')
+    INT_TYPECODE = 'q'
+except ValueError:
+    INT_TYPECODE = 'l'
 
 
 logger = logging.getLogger(__name__)
 
 
+def _numpy():
+    """Returns the numpy module, imported on first use, or None if it is
+    not installed."""
+    global numpy
+    if numpy is _NOT_IMPORTED:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+    return numpy
+
+
+# {field class: True if check may call _check}
+_fast_check = {}
+# {field class: True if load may call _load}
+_fast_load = {}
+# {field class: True if dump may call _dump}
+_fast_dump = {}
+# {method name: {model class: True if the method may be called with a
+# ValidationContext}}
+_fast_context = dict((name, {}) for name in
+                     ('populate', 'validate', 'deserialize', 'serialize'))
+_CONTEXT_METHODS = dict(populate='_populate', validate='_validate',
+                        deserialize='_deserialize', serialize='_serialize')
+
+
+def _defining_class(cls, name):
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass
+
+
+def _implements(cls, fast_name, name):
+    """True if cls implements fast_name in the class implementing name or
+    below."""
+    return issubclass(_defining_class(cls, fast_name),
+                      _defining_class(cls, name))
+
+
+def _with_context(obj, name, context, *args):
+    """Calls the method name of the model instance obj with context. A
+    model class overriding the public method below the class implementing
+    it with a context is called with the keyword arguments of context."""
+    cls = obj.__class__
+    fast = _fast_context[name].get(cls)
+    if fast is None:
+        fast = _fast_context[name][cls] = _implements(
+            cls, _CONTEXT_METHODS[name], name)
+    if fast:
+        return getattr(obj, _CONTEXT_METHODS[name])(*args, context=context)
+    return getattr(obj, name)(*args, **context.kwargs)
+
+
+def _validate_shared(obj, context):
+    # Instances shared through a ModelInternTable are frozen. Once valid they
+    # are not validated again by the other parents, which would also
+    # overwrite their _path.
+    if not (getattr(obj, '_frozen', False) and obj._validated):
+        _with_context(obj, 'validate', context)
+
+
+def _field_state(field):
+    state = dict(field.__dict__)
+    state.pop('_compiled_facets', None)
+    state.pop('check', None)
+    return state
+
+
+def _check_facets(self, raw_data, **kwargs):
+    """_check of fields checked by their facets alone."""
+    return self._facet_check()(raw_data, **kwargs)
+
+
 class ValidationException(Exception):
     """
     Serves as custom exception for all field validations.
     """
     def __init__(self, msg, value):
-        super(ValidationException, self).__init__(self, msg, repr(value))
+        super(ValidationException, self).__init__(self, msg, value)
         self._msg = msg
         self._value = value
 
@@ -45,6 +134,13 @@ class ValidationException(Exception):
 
     @property
     def msg(self):
+        """The message text."""
+        return str(self._msg)
+
+    @property
+    def lazy_msg(self):
+        """The message as given, possibly a :class:`~xmodels.utils.Message`
+        that is only rendered when converted to a string."""
         return self._msg
 
 
@@ -68,6 +164,8 @@ deserialization
     """
     serial_format = None
     _name_space = None
+    # attributes the compiled facet check depends on
+    _facet_names = frozenset()
 
     def __init__(self, **kwargs):
         self.source = kwargs.get('source')
@@ -83,6 +181,17 @@ deserialization
     def __repr__(self):
         return self.__str__()
 
+    def __setattr__(self, key, value):
+        super(BaseField, self).__setattr__(key, value)
+        if key in self._facet_names:
+            self.__dict__.pop('_compiled_facets', None)
+            self.__dict__.pop('check', None)
+
+    def __eq__(self, other):
+        if not isinstance(other, self.__class__):
+            return False
+        return _field_state(self) == _field_state(other)
+
     def get_source(self, key, name_spaces=None, default_prefix=''):
         """Generates the dictionary key for the serialized representation
         based on the instance variable source and a provided key.
@@ -106,6 +215,85 @@ deserialization
         """
         return raw_data
 
+    def check(self, raw_data, **kwargs):
+        """Validates raw_data like validate without raising an exception.
+
+        Fields implement the check in _check. A field class overriding
+        validate below the class implementing _check is checked by calling
+        validate. Fields checked by their facets alone replace this method
+        on the instance by the compiled facet check.
+
+        :returns: (True, validated_data) or (False, message)
+        """
+        cls = self.__class__
+        fast = _fast_check.get(cls)
+        if fast is None:
+            fast = _fast_check[cls] = _implements(cls, '_check', 'validate')
+        if fast:
+            if _function(cls._check) is _check_facets:
+                check = self.__dict__['check'] = self._facet_check()
+                return check(raw_data, **kwargs)
+            return self._check(raw_data, **kwargs)
+        try:
+            return True, self.validate(raw_data, **kwargs)
+        except ValidationException as e:
+            return False, e.lazy_msg
+
+    def _check(self, raw_data, **kwargs):
+        return True, raw_data
+
+    def load(self, raw_data, **kwargs):
+        """Validates and deserializes raw_data in one step without raising
+        an exception, see :meth:`~xmodels.models.Model.load`. Fields
+        implement it in _load, like check in _check.
+
+        :returns: (True, deserialized_data) or (False, message)
+        """
+        cls = self.__class__
+        fast = _fast_load.get(cls)
+        if fast is None:
+            fast = _fast_load[cls] = _implements(cls, '_load', 'deserialize')
+        if fast:
+            return self._load(raw_data, **kwargs)
+        try:
+            return True, self.deserialize(raw_data, **kwargs)
+        except ValidationException as e:
+            return False, e.lazy_msg
+
+    def _load(self, raw_data, **kwargs):
+        return self.check(raw_data, **kwargs)
+
+    def dump(self, py_data, **kwargs):
+        """Serializes py_data, a value validated before, without validating
+        it again. Fields implement it in _dump, a field class overriding
+        serialize below the class implementing _dump is dumped by calling
+        serialize."""
+        cls = self.__class__
+        fast = _fast_dump.get(cls)
+        if fast is None:
+            fast = _fast_dump[cls] = _implements(cls, '_dump', 'serialize')
+        if fast:
+            return self._dump(py_data, **kwargs)
+        return self.serialize(py_data, **kwargs)
+
+    def _dump(self, py_data, **kwargs):
+        return py_data
+
+    def _facets(self):
+        """Returns the base type and the {name: value} facets of the field,
+        see :mod:`xmodels.facets`."""
+        raise NotImplementedError
+
+    def _facet_check(self):
+        """Returns the check function compiled from _facets. It is compiled
+        again after an attribute in _facet_names is set on the instance."""
+        check = self.__dict__.get('_compiled_facets')
+        if check is None:
+            base, facets = self._facets()
+            check = compile_facets(base, facets, self.messages)
+            self.__dict__['_compiled_facets'] = check
+        return check
+
     def deserialize(self, raw_data, **kwargs):
         return self.validate(raw_data, **kwargs)
 
@@ -155,12 +343,27 @@ class AttributeField(BaseField):
         else:
             return self.field_instance.validate(raw_data, **kwargs)
 
+    def _check(self, raw_data, **kwargs):
+        if raw_data is None:
+            if self.field_instance.required:
+                return False, self.messages['required']
+            return True, None
+        return self.field_instance.check(raw_data, **kwargs)
+
     def deserialize(self, raw_data, **kwargs):
         return self.field_instance.deserialize(raw_data, **kwargs)
 
+    def _load(self, raw_data, **kwargs):
+        if raw_data is None:
+            return self._check(raw_data, **kwargs)
+        return self.field_instance.load(raw_data, **kwargs)
+
     def serialize(self, py_data, **kwargs):
         return self.field_instance.serialize(py_data, **kwargs)
 
+    def _dump(self, py_data, **kwargs):
+        return self.field_instance.dump(py_data, **kwargs)
+
 
 class RequiredAttribute(AttributeField):
     """Wrapper to describe a required XML attribute."""
@@ -173,12 +376,20 @@ class RequiredAttribute(AttributeField):
 class CharField(BaseField):
     """Field to represent a simple Unicode string value.
 
+    The ``whiteSpace`` parameter sets the xsd whiteSpace facet: 'preserve',
+    'replace' (tab, newline and carriage return become spaces) or 'collapse'
+    (additionally runs of spaces become one space and leading and trailing
+    spaces are removed). Without it the value is stripped if ``strip`` is
+    set.
+
     .. doctest::
 
         >>> from xmodels import CharField
         >>> char_field = CharField()
         >>> char_field.validate(' valid unicode string!\\n')
         'valid unicode string!'
+        >>> CharField(whiteSpace='collapse').validate(' a\\t b ')
+        'a b'
     """
     # >>> CharField().validate(42)
     # Traceback (most recent call last):
@@ -195,8 +406,12 @@ class CharField(BaseField):
     # ValidationException: ValidationException: \
     # Expecting string shorter than 8 characters, value:'0123456789'
     strip = True
+    whiteSpace = None
+    whiteSpaceStrict = False
     minLength = None
     maxLength = None
+    _facet_names = frozenset(['strip', 'whiteSpace', 'whiteSpaceStrict',
+                              'minLength', 'maxLength'])
     messages = dict(
         invalid='Expecting a string',
         tooShort='Expecting string longer than %d characters',
@@ -206,14 +421,52 @@ class CharField(BaseField):
     def __init__(self, **kwargs):
         super(CharField, self).__init__(**kwargs)
         self.strip = kwargs.get('strip', self.strip)
+        self.whiteSpace = kwargs.get('whiteSpace', self.whiteSpace)
+        self.whiteSpaceStrict = kwargs.get('whiteSpaceStrict',
+                                           self.whiteSpaceStrict)
+        assert self.whiteSpace is None or \
+            self.whiteSpace in WHITE_SPACE_FACETS, \
+            'whiteSpace needs to be one of %s.' % ', '.join(WHITE_SPACE_FACETS)
         self.minLength = kwargs.get('minLength', self.minLength)
         self.maxLength = kwargs.get('maxLength', self.maxLength)
 
+    def _white_space(self, value):
+        """Applies the xsd whiteSpace facet to value in one scan. Values
+        already in normal form are returned unchanged. With whiteSpaceStrict
+        only leading and trailing whitespace is removed, other whitespace a
+        facet would change is reported.
+
+        :returns: (True, normalized value) or (False, message)
+        """
+        facet = self.whiteSpace
+        if facet is None:
+            return True, value.strip() if self.strip else value
+        if facet == 'preserve':
+            return True, value
+        if facet == 'replace':
+            if NOT_REPLACED.search(value) is None:
+                return True, value
+            if self.whiteSpaceStrict:
+                return False, self.messages.get('whitespace',
+                                                DEFAULT_MESSAGES['whitespace'])
+            return True, NOT_REPLACED.sub(' ', value)
+        if NOT_COLLAPSED.search(value) is None:
+            return True, value
+        if self.whiteSpaceStrict:
+            value = value.strip(XML_SPACE)
+            if NOT_COLLAPSED.search(value) is not None:
+                return False, self.messages.get('whitespace',
+                                                DEFAULT_MESSAGES['whitespace'])
+            return True, value
+        return True, XML_SPACE_RUN.sub(' ', value).strip(' ')
+
     def validate(self, raw_data, **kwargs):
         super(CharField, self).validate(raw_data, **kwargs)
         if not isinstance(raw_data, string_types):
             raise ValidationException(self.messages['invalid'], raw_data)
-        stripped = raw_data.strip() if self.strip else raw_data
+        ok, stripped = self._white_space(raw_data)
+        if not ok:
+            raise ValidationException(stripped, raw_data)
         if self.minLength is not None:
             if len(stripped) < self.minLength:
                 raise ValidationException(self.messages['tooShort']
@@ -224,6 +477,14 @@ class CharField(BaseField):
                                           % self.maxLength, stripped)
         return stripped
 
+    def _facets(self):
+        return 'string', dict(strip=self.strip, whiteSpace=self.whiteSpace,
+                              whiteSpaceStrict=self.whiteSpaceStrict,
+                              minLength=self.minLength,
+                              maxLength=self.maxLength)
+
+    _check = _check_facets
+
 
 class RegexField(CharField):
     """Field to represent unicode strings matching a regular expression.
@@ -233,6 +494,7 @@ class RegexField(CharField):
     regex = r''
     messages = dict(
         no_match='The input does not match the regex')
+    _facet_names = CharField._facet_names | frozenset(['regex'])
 
     def __init__(self, **kwargs):
         super(RegexField, self).__init__(**kwargs)
@@ -246,12 +508,21 @@ class RegexField(CharField):
             raise ValidationException(self.messages['no_match'], raw_data)
         return validated_string
 
+    def _facets(self):
+        base, facets = super(RegexField, self)._facets()
+        facets['pattern'] = self.regex
+        return base, facets
+
+    _check = _check_facets
+
 
 class Token(CharField):
     """CharField for xsd:token.
     Tokens are strings without leading and trailing whitespaces. All other
     whitespaces are collapsed.
     """
+    whiteSpace = 'collapse'
+    whiteSpaceStrict = True
     messages = dict(
         whitespace="""Whitespaces should be collapsed in a token."""
     )
@@ -260,12 +531,6 @@ class Token(CharField):
         super(Token, self).__init__(**kwargs)
         self.messages.update(CharField.messages)
 
-    def validate(self, raw_data, **kwargs):
-        string_value = super(Token, self).validate(raw_data, **kwargs)
-        if ' '.join(string_value.split()) != string_value.strip():
-            raise ValidationException(self.messages['whitespace'], raw_data)
-        return string_value
-
 
 class Name(RegexField):
     """Field for xsd:name.
@@ -288,6 +553,7 @@ class Name(RegexField):
     # letter, colon (:), or underscore (_) and shall only contain letters,
     # numbers, and the colon (:), underscore (_), dash (-), and dot (.)
     # characters. Only one colon (:) total., value:'illegal!'
+    whiteSpace = 'collapse'
     regex = r'^[a-zA-Z:_][\w:_\-\.]*$'
     messages = dict(
         no_match="""A name needs to begin with a letter, colon (:), or
@@ -302,6 +568,12 @@ underscore (_), dash (-), and dot (.) characters. Only one colon (:) total.""",
             raise ValidationException(self.messages['colons'], raw_data)
         return validated_string
 
+    def _check(self, raw_data, **kwargs):
+        ok, value = super(Name, self)._check(raw_data, **kwargs)
+        if ok and value.count(':') > 1:
+            return False, self.messages['colons']
+        return ok, value
+
 
 class NCName(RegexField):
     """Field for xsd:ncname.
@@ -311,6 +583,7 @@ class NCName(RegexField):
     (_), hyphens (-), and periods (.). This is identical to the Name type,
     except that colons are not permitted.
     """
+    whiteSpace = 'collapse'
     regex = r'^[a-zA-Z_][\w_\-\.]*$'
     messages = dict(
         no_match="""A name needs to begin with a letter, or underscore (_) and
@@ -344,6 +617,7 @@ class Language(RegexField):
     the pattern specified for this type, which says that it must consist of
     one or more parts of up to eight characters each, separated by hyphens.
     """
+    whiteSpace = 'collapse'
     regex = r'^([a-zA-Z]{1,8})(-[a-zA-Z]{1,8})*$'
     messages = dict(
         no_match="""A language identifier consists of parts of one to eight
@@ -359,6 +633,7 @@ class NMTOKEN(RegexField):
     whitespace facet value of collapse, so any leading or trailing whitespace
     will be removed. However, no whitespace may appear within the value itself.
     """
+    whiteSpace = 'collapse'
     regex = r'^[\w:_\-\.]+$'
     messages = dict(
         no_match='A nmtoken shall only contain letters, numbers,\
@@ -377,6 +652,8 @@ class RangeField(BaseField):
         tooSmall='Expecting value greater than %d',
         tooLarge='Expecting value less than %d',
     )
+    _base_type = 'number'
+    _facet_names = frozenset(['min', 'max'])
 
     def __init__(self, **kwargs):
         super(RangeField, self).__init__(**kwargs)
@@ -387,20 +664,27 @@ class RangeField(BaseField):
         super(RangeField, self).validate(raw_data, **kwargs)
         if self.min is not None:
             if raw_data < self.min:
-                raise ValidationException(self.messages['tooSmall']
-                                          % self.min, raw_data)
+                raise ValidationException(Message(self.messages['tooSmall'],
+                                                  self.min), raw_data)
         if self.max is not None:
             if raw_data > self.max:
-                raise ValidationException(self.messages['tooLarge']
-                                          % self.max, raw_data)
+                raise ValidationException(Message(self.messages['tooLarge'],
+                                                  self.max), raw_data)
         return raw_data
 
+    def _facets(self):
+        return self._base_type, dict(minInclusive=self.min,
+                                     maxInclusive=self.max)
+
+    _check = _check_facets
+
 
 class IntegerField(RangeField):
     """Field to represent an integer value."""
     messages = dict(
         invalid="Could not convert to int:"
     )
+    _base_type = 'integer'
 
     def __init__(self, **kwargs):
         super(IntegerField, self).__init__(**kwargs)
@@ -416,6 +700,8 @@ class IntegerField(RangeField):
         except ValueError:
             raise ValidationException(self.messages['invalid'], repr(raw_data))
 
+    _check = _check_facets
+
 
 class NonNegativeInteger(IntegerField):
     """
@@ -446,6 +732,7 @@ class FloatField(RangeField):
         invalid="Could not convert to float:",
         format="Could not convert float to string with format %(format)s.",
     )
+    _base_type = 'float'
 
     def __init__(self, **kwargs):
         super(FloatField, self).__init__(**kwargs)
@@ -462,12 +749,23 @@ class FloatField(RangeField):
         except ValueError:
             raise ValidationException(self.messages['invalid'], repr(raw_data))
 
+    _check = _check_facets
+
     def deserialize(self, raw_data, **kwargs):
         valid_data = super(FloatField, self).deserialize(raw_data, **kwargs)
         return float(valid_data)
 
+    def _load(self, raw_data, **kwargs):
+        ok, value = self.check(raw_data, **kwargs)
+        if ok:
+            value = float(value)
+        return ok, value
+
     def serialize(self, py_data, **kwargs):
         super(FloatField, self).serialize(py_data, **kwargs)
+        return self._dump(py_data, **kwargs)
+
+    def _dump(self, py_data, **kwargs):
         if self.serial_format:
             try:
                 return self.serial_format.format(py_data)
@@ -519,13 +817,26 @@ class BooleanField(BaseField):
             valid_data = raw_data > 0
         return valid_data
 
+    def _check(self, raw_data, **kwargs):
+        return True, self.validate(raw_data, **kwargs)
+
     def serialize(self, py_data, **kwargs):
         super(BooleanField, self).serialize(py_data, **kwargs)
+        return self._dump(py_data, **kwargs)
+
+    def _dump(self, py_data, **kwargs):
         if py_data:
             return 'true'
         return 'false'
 
 
+class _Code(int):
+    """Option index stored by an EnumField with codes=True. Unlike raw
+    integers, which are rejected like any non-string input, codes are
+    accepted when stored values are validated again."""
+    __slots__ = ()
+
+
 class EnumField(CharField):
     """
     Tests that the value is one of the members of a given list (options). There
@@ -533,10 +844,21 @@ class EnumField(CharField):
 
     If matchLower is True it will also compare value.lower() with the lower
     case version of all strings in options.
+
+    Valid values are returned as the option string itself, so all instances
+    share one string object per option. With codes=True validate returns the
+    index of the option in options instead; models decode codes, also the
+    items of a FieldCollectionField, on attribute read and serialize writes
+    the option string. Only the codes returned by
+    validate are accepted as input again, raw integers are rejected.
+
+    :param list kwargs['options']: list of allowed strings
+    :param bool kwargs['codes']: store values as option indices
     """
 
     options = []
     matchLower = True
+    codes = False
 
     messages = dict(
         invalid='Invalid value',
@@ -545,6 +867,7 @@ class EnumField(CharField):
     def __init__(self, **kwargs):
         super(EnumField, self).__init__(**kwargs)
         self.options = kwargs.get('options', self.options)
+        self.codes = kwargs.get('codes', self.codes)
         self.messages.update(CharField.messages)
         assert isinstance(self.options, list), \
             'options need to be a list of strings.'
@@ -553,25 +876,69 @@ class EnumField(CharField):
             all_members_strings = (all_members_strings and
                                    isinstance(item, string_types))
         assert all_members_strings, 'options need to be a list of strings.'
-        self.lookup = None
-        self.lookup_lower = None
+        self.lookup = dict((item, item) for item in self.options)
+        self.lookup_lower = dict((item.lower(), item)
+                                 for item in self.options)
+        self.option_codes = dict((item, _Code(index))
+                                 for index, item in enumerate(self.options))
 
     def validate(self, raw_data, **kwargs):
+        value = self._match(raw_data, **kwargs)
+        if self.codes:
+            return self.option_codes[value]
+        return value
+
+    def _check(self, raw_data, **kwargs):
+        if self._is_code(raw_data):
+            return True, raw_data
+        ok, string_value = super(EnumField, self)._check(raw_data, **kwargs)
+        if not ok:
+            return ok, string_value
+        option = self._lookup(string_value)
+        if option is None:
+            return False, self._not_in(raw_data)
+        if self.codes:
+            return True, self.option_codes[option]
+        return True, option
+
+    def _match(self, raw_data, **kwargs):
+        """Returns the option matching raw_data, a string or a code."""
+        if self._is_code(raw_data):
+            return self.options[raw_data]
         string_value = super(EnumField, self).validate(raw_data, **kwargs)
-        if not self.lookup:
-            self.lookup = set(item for item in self.options)
-        if not self.lookup_lower:
-            self.lookup_lower = dict((item.lower(), item)
-                                     for item in self.options)
-        if string_value in self.lookup:
-            return string_value
-        lower_case_value = string_value.lower()
-        if lower_case_value in self.lookup_lower:
-            correct_value = self.lookup_lower[lower_case_value]
+        option = self._lookup(string_value)
+        if option is None:
+            raise ValidationException(self._not_in(raw_data), raw_data)
+        return option
+
+    def _is_code(self, raw_data):
+        return (self.codes and isinstance(raw_data, _Code) and
+                raw_data < len(self.options))
+
+    def _lookup(self, string_value):
+        option = self.lookup.get(string_value)
+        if option is not None:
+            return option
+        correct_value = self.lookup_lower.get(string_value.lower())
+        if correct_value is not None:
             self._raw = correct_value
-            return correct_value
-        raise ValidationException(self.messages['notIn'] % dict(
-            items=self._options_str, value=raw_data), raw_data)
+        return correct_value
+
+    def _not_in(self, raw_data):
+        return Message(self.messages['notIn'],
+                       dict(items=self._options_str, value=raw_data))
+
+    def decode(self, value):
+        """Returns the option for a code, other values unchanged."""
+        if isinstance(value, integer_types) and not isinstance(value, bool):
+            return self.options[value]
+        return value
+
+    def serialize(self, py_data, **kwargs):
+        return self._match(py_data, **kwargs)
+
+    def _dump(self, py_data, **kwargs):
+        return self.decode(py_data)
 
     @property
     def _options_str(self):
@@ -592,6 +959,7 @@ class DateTimeField(BaseField):
     messages = dict(
         parse='%(cls)s Error Parsing %(data)s with format %(format)s'
     )
+    _value_type = datetime.datetime
 
     def __init__(self, **kwargs):
         super(DateTimeField, self).__init__(**kwargs)
@@ -612,9 +980,9 @@ class DateTimeField(BaseField):
                                                             self.serial_format)
             return raw_data
         except (ParseError, ValueError) as e:
-            msg = self.messages['parse'] % dict(cls=self.__class__.__name__,
-                                                data=raw_data,
-                                                format=self.serial_format)
+            msg = Message(self.messages['parse'],
+                          dict(cls=self.__class__.__name__, data=raw_data,
+                               format=self.serial_format))
             raise ValidationException(msg, raw_data)
 
     def deserialize(self, raw_data, **kwargs):
@@ -622,15 +990,32 @@ class DateTimeField(BaseField):
         super(DateTimeField, self).deserialize(raw_data, **kwargs)
         return self.converted
 
+    def _load(self, raw_data, **kwargs):
+        ok, value = self.check(raw_data, **kwargs)
+        if ok:
+            value = self.converted
+        return ok, value
+
     def serialize(self, py_data, **kwargs):
         time_obj = self.deserialize(py_data, **kwargs)
         if not self.serial_format:
             return time_obj.isoformat()
         return time_obj.strftime(self.serial_format)
 
+    def _dump(self, py_data, **kwargs):
+        # validated values are still the validated strings until deserialized
+        if isinstance(py_data, string_types):
+            return py_data
+        if type(py_data) is not self._value_type:
+            return self.serialize(py_data, **kwargs)
+        if not self.serial_format:
+            return py_data.isoformat()
+        return py_data.strftime(self.serial_format)
+
 
 class DateField(DateTimeField):
     """Field to represent a :mod:`datetime.date`"""
+    _value_type = datetime.date
 
     def validate(self, raw_data, **kwargs):
         try:
@@ -647,14 +1032,15 @@ class DateField(DateTimeField):
             self.converted = valid_data
             return raw_data
         except (ParseError, ValueError) as e:
-            msg = self.messages['parse'] % dict(cls=self.__class__.__name__,
-                                                data=raw_data,
-                                                format=self.serial_format)
+            msg = Message(self.messages['parse'],
+                          dict(cls=self.__class__.__name__, data=raw_data,
+                               format=self.serial_format))
             raise ValidationException(msg, raw_data)
 
 
 class TimeField(DateTimeField):
     """Field to represent a :mod:`datetime.time`"""
+    _value_type = datetime.time
 
     def validate(self, raw_data, **kwargs):
         try:
@@ -671,14 +1057,19 @@ class TimeField(DateTimeField):
             self.converted = valid_data
             return raw_data
         except (ParseError, ValueError) as e:
-            msg = self.messages['parse'] % dict(cls=self.__class__.__name__,
-                                                data=raw_data,
-                                                format=self.serial_format)
+            msg = Message(self.messages['parse'],
+                          dict(cls=self.__class__.__name__, data=raw_data,
+                               format=self.serial_format))
             raise ValidationException(msg, raw_data)
 
 
 class WrappedObjectField(BaseField):
-    """Superclass for any fields that wrap an object"""
+    """Superclass for any fields that wrap an object
+
+    The methods of the wrapped models are called with the
+    :class:`~xmodels.context.ValidationContext` of the traversal, the public
+    methods create one from their keyword arguments.
+    """
 
     def __init__(self, wrapped_class, **kwargs):
         self._wrapped_class = wrapped_class
@@ -690,28 +1081,88 @@ class WrappedObjectField(BaseField):
                         self._wrapped_class.__name__])
 
     def populate(self, raw_data, **kwargs):
+        return self._populate_object(raw_data,
+                                     ValidationContext.from_kwargs(kwargs))
+
+    def _populate_object(self, raw_data, context):
         if isinstance(raw_data, self._wrapped_class):
-            obj = raw_data
-        else:
-            obj = self._wrapped_class()
-            if isinstance(raw_data, (dict, OrderedDict)):
-                obj.populate(raw_data, **kwargs)
-            elif raw_data is not None:
-                obj.populate({'#text': raw_data}, **kwargs)
+            return raw_data
+        model_intern = context.get('model_intern')
+        intern_key = None
+        if model_intern is not None and \
+                getattr(self._wrapped_class, '_internable', False):
+            intern_key = model_intern.key(self._wrapped_class, raw_data,
+                                          context.get('name_spaces'),
+                                          context.get('clark_names'))
+            obj = model_intern.get(intern_key)
+            if obj is not None:
+                return obj
+        obj = self._wrapped_class()
+        if isinstance(raw_data, (dict, OrderedDict)):
+            _with_context(obj, 'populate', context, raw_data)
+        elif raw_data is not None:
+            _with_context(obj, 'populate', context, {'#text': raw_data})
+        if intern_key is not None:
+            model_intern.add(intern_key, obj)
         return obj
 
     def validate(self, raw_data, **kwargs):
         super(WrappedObjectField, self).validate(raw_data, **kwargs)
-        obj = self.populate(raw_data, **kwargs)
-        obj.validate(**kwargs)
+        return self._validate_object(raw_data,
+                                     ValidationContext.from_kwargs(kwargs))
+
+    def _validate_object(self, raw_data, context):
+        obj = self._populate_object(raw_data, context)
+        _validate_shared(obj, context)
         return obj
 
     def deserialize(self, raw_data, **kwargs):
-        obj = super(WrappedObjectField, self).deserialize(raw_data, **kwargs)
-        return obj.deserialize(**kwargs)
+        return self._deserialize_object(raw_data,
+                                        ValidationContext.from_kwargs(kwargs))
+
+    def _deserialize_object(self, raw_data, context):
+        obj = self._validate_object(raw_data, context)
+        return _with_context(obj, 'deserialize', context)
+
+    def _load_object(self, raw_data, context):
+        """Returns the validated and deserialized instance of the wrapped
+        class for raw_data, see :meth:`~xmodels.models.Model.load`."""
+        if isinstance(raw_data, self._wrapped_class):
+            _with_context(raw_data, 'validate', context)
+            return _with_context(raw_data, 'deserialize', ValidationContext(
+                **dict(context.kwargs, errors=[])))
+        model_intern = context.get('model_intern')
+        intern_key = None
+        if model_intern is not None and \
+                getattr(self._wrapped_class, '_internable', False):
+            intern_key = model_intern.key(self._wrapped_class, raw_data,
+                                          context.get('name_spaces'),
+                                          context.get('clark_names'))
+            obj = model_intern.get(intern_key)
+            if obj is not None:
+                return obj
+        if isinstance(raw_data, (dict, OrderedDict)):
+            data = raw_data
+        elif raw_data is not None:
+            data = {'#text': raw_data}
+        else:
+            data = {}
+        errors = context.errors
+        error_count = len(errors)
+        obj = self._wrapped_class()
+        obj._load(data, context)
+        # Only instances without errors are shared, errors are reported for
+        # every occurrence.
+        if intern_key is not None and len(errors) == error_count:
+            model_intern.add(intern_key, obj)
+        return obj
 
     def serialize(self, py_data, **kwargs):
-        return py_data.serialize(**kwargs)
+        return self._serialize_object(py_data,
+                                      ValidationContext.from_kwargs(kwargs))
+
+    def _serialize_object(self, py_data, context, trusted=False):
+        return _with_context(py_data, 'serialize', context)
 
     @property
     def name_space(self):
@@ -750,9 +1201,13 @@ class ModelField(WrappedObjectField):
         super(ModelField, self).__init__(wrapped_class, **kwargs)
         self._model_instance = None
 
-    def validate(self, raw_data, **kwargs):
-        kwargs.update(instance_index=None)
-        return super(ModelField, self).validate(raw_data, **kwargs)
+    def _validate_object(self, raw_data, context):
+        context.instance_index = None
+        return super(ModelField, self)._validate_object(raw_data, context)
+
+    def _load_object(self, raw_data, context):
+        context.instance_index = None
+        return super(ModelField, self)._load_object(raw_data, context)
 
 
 class ModelCollectionField(WrappedObjectField):
@@ -783,35 +1238,47 @@ class ModelCollectionField(WrappedObjectField):
     def __init__(self, wrapped_class, **kwargs):
         super(ModelCollectionField, self).__init__(wrapped_class, **kwargs)
 
-    def populate(self, raw_data, **kwargs):
+    def _populate_object(self, raw_data, context):
+        if not isinstance(raw_data, list):
+            raw_data = [raw_data]
+        populate = super(ModelCollectionField, self)._populate_object
+        return [populate(item, context) for item in raw_data]
+
+    def _validate_object(self, raw_data, context):
+        objects = self._populate_object(raw_data, context)
+        for index, item in enumerate(objects):
+            context.instance_index = index
+            _validate_shared(item, context)
+        return objects
+
+    def _deserialize_object(self, raw_data, context):
+        objects = self._validate_object(raw_data, context)
+        return [_with_context(obj, 'deserialize', context)
+                for obj in objects]
+
+    def _load_object(self, raw_data, context):
         if not isinstance(raw_data, list):
             raw_data = [raw_data]
+        load_object = super(ModelCollectionField, self)._load_object
         result = []
         for index, item in enumerate(raw_data):
-            path = kwargs.get('path', '<inst>') + '[%d]' % index
-            kwargs_copy = dict((key, value) for key, value in kwargs.items())
-            kwargs_copy.update(path=path)
-            obj = super(ModelCollectionField, self).populate(item,
-                                                             **kwargs_copy)
-            result.append(obj)
+            context.instance_index = index
+            result.append(load_object(item, context))
         return result
 
-    def validate(self, raw_data, **kwargs):
-        objects = self.populate(raw_data, **kwargs)
-        result = []
-        for index, item in enumerate(objects):
-            kwargs.update(instance_index=index)
-            item.validate(**kwargs)
-            result.append(item)
-        return result
+    def _serialize_object(self, py_data, context, trusted=False):
+        if not trusted or not isinstance(py_data, list):
+            py_data = self._validate_object(py_data, context)
+        return [_with_context(obj, 'serialize', context) for obj in py_data]
 
-    def deserialize(self, raw_data, **kwargs):
-        objects = self.validate(raw_data, **kwargs)
-        return [obj.deserialize(**kwargs) for obj in objects]
+    def _dump(self, py_data, **kwargs):
+        return self._serialize_object(py_data,
+                                      ValidationContext.from_kwargs(kwargs),
+                                      trusted=True)
 
-    def serialize(self, py_data, **kwargs):
-        objects = self.validate(py_data, **kwargs)
-        return [obj.serialize(**kwargs) for obj in objects]
+
+def _function(method):
+    return getattr(method, '__func__', method)
 
 
 class FieldCollectionField(BaseField):
@@ -819,6 +1286,16 @@ class FieldCollectionField(BaseField):
 
     The constructor takes an instance of the field.
 
+    validate checks all items and reports every invalid item with its index
+    in a single ValidationException, the (index, message) pairs are stored
+    in its item_errors. With NumPy installed, lists of at least
+    vectorize_min_size items of an IntegerField or FloatField are converted
+    and range checked as one array.
+
+    With typed=True the validated items of an IntegerField or FloatField are
+    stored in an ``array.array`` of machine integers or doubles instead of a
+    list. Integers that do not fit are stored in a list.
+
     Here are some examples::
 
         data = {
@@ -857,36 +1334,158 @@ class FieldCollectionField(BaseField):
 
     Let's check out the resulting :class:`~xmodels.Model` instance with the
 
+    :param bool kwargs['typed']: store numeric items in an array.array
     """
+    vectorize_min_size = 64
+
     def __init__(self, field_instance, **kwargs):
         super(FieldCollectionField, self).__init__(**kwargs)
         if not isinstance(field_instance, BaseField):
             raise TypeError('Field instance of type BaseField expected.')
         self._instance = field_instance
+        self.typed = kwargs.get('typed', False)
+        self._typecode = None
+        if self.typed:
+            if isinstance(field_instance, IntegerField):
+                self._typecode = INT_TYPECODE
+            elif isinstance(field_instance, FloatField):
+                self._typecode = 'd'
 
     def __str__(self):
         return '%s(%s)' % (self.__class__.__name__,
                            self._instance.__class__.__name__)
 
     def validate(self, raw_data, **kwargs):
-        if not isinstance(raw_data, list):
+        if isinstance(raw_data, array):
+            raw_data = raw_data.tolist()
+        elif not isinstance(raw_data, list):
             raw_data = [raw_data]
+        if len(raw_data) >= self.vectorize_min_size and \
+                _numpy() is not None:
+            result = self._validate_vectorized(raw_data)
+            if result is not None:
+                return result
         result = []
-        for item in raw_data:
-            result.append(self._instance.validate(item))
+        item_errors = []
+        check = self._instance.check
+        for index, item in enumerate(raw_data):
+            ok, value = check(item)
+            if ok:
+                result.append(value)
+            else:
+                item_errors.append((index, value))
+        if item_errors:
+            raise self._items_exception(item_errors, raw_data)
+        if self._typecode is not None:
+            return self._to_array(result)
         return result
 
+    def decode(self, value):
+        """Returns the items decoded by the field instance, see
+        :meth:`EnumField.decode`."""
+        if not isinstance(value, list):
+            return value
+        decode = self._instance.decode
+        return [decode(item) for item in value]
+
+    def _to_array(self, items):
+        try:
+            if self._typecode == 'd':
+                return array('d', [float(item) for item in items])
+            return array(self._typecode, items)
+        except OverflowError:
+            return list(items)
+
+    def _validate_vectorized(self, raw_data):
+        """Returns the validated items or None if the items must be validated
+        one by one."""
+        numpy = _numpy()
+        validate = _function(type(self._instance).validate)
+        if validate is _function(IntegerField.validate):
+            dtype = numpy.int64
+        elif validate is _function(FloatField.validate):
+            dtype = numpy.float64
+        else:
+            return None
+        try:
+            values = numpy.array(raw_data, dtype=dtype)
+        except (ValueError, TypeError, OverflowError):
+            return None
+        if values.ndim != 1:
+            return None
+        instance = self._instance
+        item_errors = []
+        if instance.min is not None:
+            msg = instance.messages['tooSmall'] % instance.min
+            item_errors.extend((index, msg) for index in
+                               numpy.flatnonzero(values < instance.min))
+        if instance.max is not None:
+            msg = instance.messages['tooLarge'] % instance.max
+            item_errors.extend((index, msg) for index in
+                               numpy.flatnonzero(values > instance.max))
+        if item_errors:
+            item_errors = sorted((int(index), msg)
+                                 for index, msg in item_errors)
+            raise self._items_exception(item_errors, raw_data)
+        if self._typecode is not None:
+            result = array(self._typecode)
+            if result.itemsize != values.itemsize:
+                return self._to_array(values.tolist())
+            getattr(result, 'frombytes', result.fromstring)(values.tobytes())
+            return result
+        if dtype is numpy.int64:
+            return values.tolist()
+        # FloatField.validate returns the items unchanged.
+        return list(raw_data)
+
+    @staticmethod
+    def _items_exception(item_errors, raw_data):
+        msg = '; '.join('[%d] %s' % (index, msg) for index, msg in item_errors)
+        exception = ValidationException(
+            msg, [raw_data[index] for index, _ in item_errors])
+        exception.item_errors = item_errors
+        return exception
+
     def deserialize(self, raw_data, **kwargs):
         items = self.validate(raw_data, **kwargs)
         result = []
         for item in items:
             result.append(self._instance.deserialize(item))
+        if self._typecode is not None:
+            return self._to_array(result)
         return result
 
+    def _load(self, raw_data, **kwargs):
+        if isinstance(raw_data, array):
+            raw_data = raw_data.tolist()
+        elif not isinstance(raw_data, list):
+            raw_data = [raw_data]
+        load = self._instance.load
+        result = []
+        item_errors = []
+        for index, item in enumerate(raw_data):
+            ok, value = load(item)
+            if ok:
+                result.append(value)
+            else:
+                item_errors.append((index, value))
+        if item_errors:
+            return False, self._items_exception(item_errors,
+                                                raw_data).lazy_msg
+        if self._typecode is not None:
+            return True, self._to_array(result)
+        return True, result
+
     def serialize(self, py_data, **kwargs):
-        if not isinstance(py_data, list):
+        if not isinstance(py_data, (list, array)):
             py_data = [py_data]
         result = []
         for item in py_data:
             result.append(self._instance.serialize(item))
         return result
+
+    def _dump(self, py_data, **kwargs):
+        if not isinstance(py_data, (list, array)):
+            py_data = [py_data]
+        dump = self._instance.dump
+        return [dump(item) for item in py_data]
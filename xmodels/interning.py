@@ -0,0 +1,117 @@
+"""
+Interning tables to share identical values between model instances while
+populating large documents.
+"""
+import sys
+from weakref import WeakValueDictionary
+
+from six import string_types
+from six.moves import intern
+
+
+class ModelInternTable(object):
+    """
+    Hash-consing table for attribute-only models (AttributeModel). Pass an
+    instance as the model_intern keyword to populate, from_dict or from_xml
+    and every element with the same class and the same raw attribute values
+    is populated once and shared. Shared instances are frozen; use
+    :meth:`xmodels.models.Model.clone` to get a modifiable copy. They are
+    validated once and keep the path of their first occurrence.
+
+    By default the table lives as long as the table instance, e.g. for a
+    single load. With weak=True entries are dropped as soon as no model
+    refers to them any more, which makes a single global table safe to keep.
+    """
+    def __init__(self, weak=False):
+        self._table = WeakValueDictionary() if weak else {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._table)
+
+    @staticmethod
+    def key(model_class, raw_data, name_spaces=None, clark_names=False):
+        """Returns the intern key for raw_data or None if raw_data contains
+        unhashable values, e.g. child elements. The same raw keys map to
+        other fields with other name_spaces or clark_names, so they are part
+        of the key."""
+        if isinstance(raw_data, dict):
+            items = raw_data.items()
+        else:
+            items = [('#text', raw_data)]
+        try:
+            return (model_class,
+                    model_class._name_spaces_key(name_spaces, clark_names),
+                    frozenset(items))
+        except TypeError:
+            return None
+
+    def get(self, key):
+        if key is None:
+            return None
+        instance = self._table.get(key)
+        if instance is not None:
+            self.hits += 1
+        return instance
+
+    def add(self, key, instance):
+        self.misses += 1
+        instance._frozen = True
+        self._table[key] = instance
+        return instance
+
+
+class StringInternTable(object):
+    """
+    Deduplicates short strings such as tag names, namespace prefixed keys and
+    token values. Pass an instance as the string_intern keyword to populate,
+    validate, from_dict or from_xml. Extra keys and raw values are interned
+    by populate, validated values by validate.
+
+    Strings longer than max_length are left alone. With use_global=True
+    strings are interned in the interpreter wide table (sys.intern) instead
+    of a table owned by this instance.
+
+    saved_bytes reports the size of the duplicate strings that were replaced
+    by an already interned equal string.
+    """
+    def __init__(self, max_length=64, use_global=False):
+        self.max_length = max_length
+        self.use_global = use_global
+        self._table = {}
+        self.hits = 0
+        self.saved_bytes = 0
+
+    def __len__(self):
+        return len(self._table)
+
+    def __str__(self):
+        return '%s: %d duplicates, %d bytes saved' % (
+            self.__class__.__name__, self.hits, self.saved_bytes)
+
+    def intern(self, value):
+        if not isinstance(value, string_types) or \
+                len(value) > self.max_length:
+            return value
+        interned = None
+        if self.use_global:
+            try:
+                interned = intern(value)
+            except TypeError:
+                # Python 2 can only intern byte strings.
+                pass
+        if interned is None:
+            interned = self._table.setdefault(value, value)
+        if interned is not value:
+            self.hits += 1
+            self.saved_bytes += sys.getsizeof(value)
+        return interned
+
+    def intern_value(self, value):
+        """Interns value or, if value is a list, the strings in the list."""
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                value[index] = self.intern(item)
+            return value
+        return self.intern(value)
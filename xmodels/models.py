@@ -1,15 +1,36 @@
+from array import array
+import hashlib
 import logging
+import re
+import types
+import weakref
+
 from six import with_metaclass
 
 from .fields import BaseField, WrappedObjectField, ValidationException, \
-    RequiredAttribute, AttributeField
+    RequiredAttribute, AttributeField, ModelField, FieldCollectionField, \
+    _with_context
 from .constraints import Stores
-from .utils import CommonEqualityMixin, MsgRecord
+from .context import ValidationContext
+from .utils import CommonEqualityMixin, Message, ModelPath, MsgRecord, \
+    XSI_NS, clark_name, to_clark
 
 
 logger = logging.getLogger(__name__)
 
 
+class _Deferred(object):
+    """Message argument calling function(*args) when formatted."""
+    __slots__ = ('function', 'args')
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def __str__(self):
+        return self.function(*self.args)
+
+
 def error(logger_inst, message, **kwargs):
     kwargs['errors'].append(message)
     logger_inst.error(message)
@@ -102,8 +123,13 @@ class Choice(CommonEqualityMixin):
         return key_sets
 
     def match_choice_keys(self, value_key_set, **kwargs):
-        no_match_msg = "Could not match keys: %s with: choices: %s" % (
-            ', '.join(value_key_set), self.choice_keys_str())
+        return self._match_choice_keys(value_key_set,
+                                       ValidationContext.from_kwargs(kwargs))
+
+    def _match_choice_keys(self, value_key_set, context):
+        no_match_msg = Message("Could not match keys: %s with: choices: %s",
+                               (_Deferred(', '.join, value_key_set),
+                                _Deferred(self.choice_keys_str)))
         if value_key_set == set([]) and not self.required:
             return []
         max_key_sets = [self.required_keys_sets[i] | self.optional_keys_sets[i]
@@ -113,9 +139,9 @@ class Choice(CommonEqualityMixin):
         max_key_matches = [value_key_set <= max_keys
                            for max_keys in max_key_sets]
         if not any(min_key_matches):
-            error(logger, no_match_msg, **kwargs)
+            context.error(logger, no_match_msg)
         if not any(max_key_matches):
-            error(logger, no_match_msg, **kwargs)
+            context.error(logger, no_match_msg)
         if any(min_key_matches) and any(max_key_matches):
             matches = [i for i in range(len(self.options))
                        if min_key_matches[i] and max_key_matches[i]]
@@ -125,9 +151,8 @@ class Choice(CommonEqualityMixin):
                 matched_fields = [field.tag
                                   for field in self.options[matches[0]]
                                   if field.tag in value_key_set]
-            msg = "Matched keys: %s with option: %d" % \
-                  (', '.join(value_key_set), matches[0])
-            logger.debug(msg)
+            logger.debug("Matched keys: %s with option: %d",
+                         _Deferred(', '.join, value_key_set), matches[0])
             return matched_fields
         return [self._flat_options[tag] for tag in value_key_set
                 if tag in self._flat_options]
@@ -147,11 +172,92 @@ class Options(object):
                 self.__dict__[key] = value
 
 
+# Runtime state and derived data of fields and options that does not
+# describe the schema. Messages are shared between field classes and are
+# mutated by AttributeField.
+_FINGERPRINT_IGNORE = frozenset(['key_to_source', 'source_to_key',
+                                 'source_maps',
+                                 'converted', '_raw', '_model_instance',
+                                 'lookup', 'lookup_lower', 'messages',
+                                 '_compiled_facets', 'check'])
+_NOT_STATE = (types.FunctionType, property, staticmethod, classmethod)
+_PATTERN_TYPE = type(re.compile(''))
+
+
+def _qualified_name(cls):
+    return '%s.%s' % (cls.__module__, cls.__name__)
+
+
+def _object_state(value):
+    state = {}
+    for klass in reversed(type(value).__mro__[:-1]):
+        state.update((key, item) for key, item in vars(klass).items()
+                     if not key.startswith('__') and
+                     not isinstance(item, _NOT_STATE))
+    state.update(value.__dict__)
+    return dict((key, item) for key, item in state.items()
+                if key not in _FINGERPRINT_IGNORE)
+
+
+def _schema_description(value, seen):
+    """Returns a deterministic string describing value. Model classes are
+    described once, further references only by name."""
+    if isinstance(value, ModelType):
+        name = _qualified_name(value)
+        if value in seen:
+            return 'ref(%s)' % name
+        seen.add(value)
+        fields = getattr(value, '_attribute_fields', None)
+        fields = fields() if fields else value._clsfields
+        options = dict((key, item)
+                       for key, item in value._meta.__dict__.items()
+                       if not key.startswith('__') and
+                       key not in _FINGERPRINT_IGNORE)
+        return 'model(%s, %s, %s)' % (name,
+                                      _schema_description(fields, seen),
+                                      _schema_description(options, seen))
+    if isinstance(value, dict):
+        items = sorted('%r: %s' % (key, _schema_description(item, seen))
+                       for key, item in value.items())
+        return '{%s}' % ', '.join(items)
+    if isinstance(value, (list, tuple)):
+        return '[%s]' % ', '.join(_schema_description(item, seen)
+                                  for item in value)
+    if isinstance(value, (set, frozenset)):
+        return 'set(%s)' % ', '.join(sorted(_schema_description(item, seen)
+                                            for item in value))
+    if isinstance(value, _PATTERN_TYPE):
+        return 're(%r)' % value.pattern
+    if isinstance(value, type) or callable(value):
+        return _qualified_name(value)
+    if hasattr(value, '__dict__'):
+        return '%s%s' % (_qualified_name(value.__class__),
+                         _schema_description(_object_state(value), seen))
+    return repr(value)
+
+
+# source_maps key of the maps for sources in Clark notation.
+_CLARK = 'clark'
+_XSI_SCHEMA_LOCATION = clark_name(XSI_NS, '@schemaLocation')
+
+# Model classes with a Meta.root_tag keyed on (name space URI, root tag).
+_root_models = {}
+
+
+def get_root_model(name_space, root_tag):
+    """Returns the model class registered for the document root element
+    root_tag in name_space or None."""
+    return _root_models.get((name_space, root_tag))
+
+
 class ModelType(type):
     """Creates the metaclass for Model. The main function of this metaclass
     is to move all of fields into the _clsfields variable on the class and to
     combine/update the class variables of the inner class Meta into an Options
     instance which is stored under _meta.
+
+    Classes with a Meta.root_tag are registered as models of document root
+    elements, see :func:`load`.
     """
 
     def __new__(cls, name, bases, attrs):
@@ -172,6 +278,15 @@ class ModelType(type):
                 new_class._clsfields[key] = value
         for key in new_class._clsfields.keys():
             attrs.pop(key, None)
+        new_class._field_names = tuple(new_class._clsfields)
+        # Fields storing encoded values, decoded on attribute read.
+        new_class._decoders = {}
+        for key, field in new_class._clsfields.items():
+            field = getattr(field, 'field_instance', None) or field
+            if getattr(field, 'codes', False) or \
+                    isinstance(field, FieldCollectionField) and \
+                    getattr(field._instance, 'codes', False):
+                new_class._decoders[key] = field
         for key, field in new_class._clsfields.items():
             if field.default is not None:
                 new_class._defaults[key] = field.default
@@ -182,12 +297,73 @@ class ModelType(type):
             for key, value in attr_meta.__dict__.items():
                 if not key.startswith('__'):
                     setattr(options, key, value)
+        options.source_maps = {}
         new_class._meta = options
+        if getattr(options, 'root_tag', None):
+            name_space = getattr(options, 'name_space', None)
+            _root_models[(name_space, options.root_tag)] = new_class
         # Add all attributes to the class.
         for obj_name, obj in attrs.items():
             setattr(new_class, obj_name, obj)
         return new_class
 
+    @property
+    def fingerprint(cls):
+        """Hex digest of the schema described by the model class and every
+        model class reachable from it: fields and their parameters, sources,
+        name spaces, Meta.sequence/Choice structure and the other Meta
+        options. It is computed on first access and memoized per class."""
+        fingerprint = cls.__dict__.get('_fingerprint')
+        if fingerprint is None:
+            description = _schema_description(cls, set([]))
+            fingerprint = hashlib.sha1(description.encode('utf-8')).hexdigest()
+            cls._fingerprint = fingerprint
+        return fingerprint
+
+
+def _structural_hash(value, parent):
+    if isinstance(value, Model):
+        value._add_hash_parent(parent)
+        return hash(value)
+    if isinstance(value, (list, tuple, array)):
+        return hash(tuple(_structural_hash(item, parent) for item in value))
+    if isinstance(value, dict):
+        return hash(frozenset((key, _structural_hash(item, parent))
+                              for key, item in value.items()))
+    try:
+        return hash(value)
+    except TypeError:
+        return hash(repr(value))
+
+
+def _clone_value(value):
+    if isinstance(value, Model):
+        return value.clone()
+    if isinstance(value, list):
+        return [_clone_value(item) for item in value]
+    if isinstance(value, array):
+        return array(value.typecode, value)
+    return value
+
+
+def _unpickle_model(cls, mask, values, extra=None, data_sequence=None,
+                    validated=False):
+    instance = cls._blank()
+    data = instance._data
+    values = iter(values)
+    for index, key in enumerate(cls._field_names):
+        if mask >> index & 1:
+            data[key] = next(values)
+    instance._non_empty_fields.update(key for key, value in data.items()
+                                      if value is not None)
+    if extra:
+        instance._extra.update(extra)
+    if data_sequence is not None:
+        instance._data_sequence = data_sequence
+    if validated:
+        instance._validated = True
+    return instance
+
 
 class Model(with_metaclass(ModelType)):
     """The Model is the main component of xmodels.models. It is the base class
@@ -202,7 +378,33 @@ class Model(with_metaclass(ModelType)):
     class variables if Meta.allow_extra_elements is True. Otherwise the
     model validation fails. The validation results are stored in a logger
     instance.
+
+    Instances can be cloned cheaply with :meth:`clone`.
+
+    Models compare and hash structurally by class, _data and _extra. The hash
+    is computed bottom-up and cached per instance. A write to an instance
+    through attribute assignment, populate, validate or deserialize clears
+    its cache and those of the instances containing it. In-place changes to
+    collection lists are not tracked.
+
+    :meth:`view` creates an instance backed by a raw dict instead of _data.
+
+    populate, validate, deserialize and serialize pass one
+    :class:`~xmodels.context.ValidationContext` to the nested instances,
+    created from their keyword arguments or passed as context.
+
+    An instance remembers if validate, deserialize or :meth:`load` reported
+    no errors for it, views never do. Until the next write
+    ``serialize(trusted=True)`` serializes its values without validating
+    them again.
     """
+    _tables = None
+    _hash_cache = None
+    _frozen = False
+    _internable = False
+    _raw = None
+    _validated = False
+
     class Meta:
         allow_extra_elements = False
         allow_extra_attributes = False
@@ -210,6 +412,7 @@ class Model(with_metaclass(ModelType)):
         required_attributes = None
         initial = None
         sequence = None
+        root_tag = None
 
     def __init__(self):
         self._extra = {}
@@ -226,24 +429,100 @@ class Model(with_metaclass(ModelType)):
     def __repr__(self):
         return self.__str__()
 
+    def __hash__(self):
+        value = self._hash_cache
+        if value is None:
+            value = hash((self.__class__, _structural_hash(self._data, self),
+                          _structural_hash(self._extra, self),
+                          _structural_hash(self._raw, self)))
+            self.__dict__['_hash_cache'] = value
+        return value
+
+    def _add_hash_parent(self, parent):
+        # Instances whose cached hash includes this one, keyed by id.
+        parents = self.__dict__.get('_hash_parents')
+        if parents is None:
+            parents = self.__dict__['_hash_parents'] = {}
+        parents[id(parent)] = weakref.ref(parent)
+
+    def _invalidate_hash(self):
+        # A parent computes its hash after those of its nested models, so
+        # the walk stops at instances without a cached hash.
+        stack = [self]
+        while stack:
+            instance = stack.pop()
+            if instance._hash_cache is None:
+                continue
+            instance.__dict__['_hash_cache'] = None
+            parents = instance.__dict__.get('_hash_parents')
+            if parents:
+                stack.extend(parent for parent in
+                             (ref() for ref in parents.values())
+                             if parent is not None)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, self.__class__) or hash(self) != hash(other):
+            return False
+        return self._data == other._data and self._extra == other._extra \
+            and self._raw == other._raw
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __reduce__(self):
+        # Compact pickle format: the class, a bit mask of the fields present
+        # in _data and their values in field declaration order.
+        # Views are pickled with their values copied from the raw dict.
+        mask = 0
+        values = []
+        data = self._data
+        extra = self._extra
+        if self._raw is not None:
+            data = dict((key, self._field_value(key))
+                        for key in set(self._view_keys()) | set(self._data))
+            extra = dict(self._view_extra(), **self._extra)
+        for index, key in enumerate(self._field_names):
+            if key in data:
+                mask |= 1 << index
+                values.append(data[key])
+        args = (self.__class__, mask, tuple(values), extra or None)
+        if self._validated:
+            args += (None, True)
+        return _unpickle_model, args
+
     def __getattr__(self, key):
+        if self._tables is not None and isinstance(self._data.get(key),
+                                                   (Model, list, array)):
+            self._own_data()
         data = self._data.get(key)
         if data is None:
             data = self._extra.get(key)
+        if data is None and self._raw is not None:
+            data = self._view_value(key)
         if data is None:
             data = self._defaults.get(key)
+        elif self._decoders and key in self._decoders:
+            data = self._decoders[key].decode(data)
         return data
 
     def __setattr__(self, key, value):
+        if self._frozen and not key.startswith('_'):
+            raise AttributeError('%s instance is frozen, modify a clone() '
+                                 'instead.' % self.__class__.__name__)
         if key in self._clsfields.keys():
+            self._before_write()
             self._data[key] = value
             if value is not None:
                 self._non_empty_fields.add(key)
         elif key.startswith('_'):
             self.__dict__[key] = value
         elif key[0] == '@' and self._meta.allow_extra_attributes:
+            self._before_write()
             self._extra[key] = value
         elif key[0] != '@' and self._meta.allow_extra_elements:
+            self._before_write()
             self._extra[key] = value
         else:
             raise AttributeError
@@ -254,20 +533,186 @@ class Model(with_metaclass(ModelType)):
         This factory for :class:`Model` creates a Model from a dict object.
         """
         instance = cls()
-        instance.populate(raw_data, **kwargs)
-        instance.validate(**kwargs)
+        context = ValidationContext.from_kwargs(kwargs)
+        _with_context(instance, 'populate', context, raw_data)
+        _with_context(instance, 'validate', context)
         return instance
 
-    def _gen_key_to_from_source(self, name_spaces):
-        self._meta.source_to_key = {}
-        default_prefix = ''
-        if name_spaces and self._meta.name_space in name_spaces:
-            default_prefix = ''.join([name_spaces[self._meta.name_space], ':'])
-        for key, field in self._clsfields.items():
-            source = field.get_source(key, name_spaces, default_prefix)
-            self._meta.source_to_key[source] = key
-        self._meta.key_to_source = dict(
-            [(value, key) for key, value in self._meta.source_to_key.items()])
+    @classmethod
+    def load(cls, raw_data, **kwargs):
+        """
+        Creates an instance from raw_data in a single pass. Every value is
+        validated and deserialized once, the result equals
+        ``from_dict(raw_data).deserialize()`` and the errors reported are
+        those of :meth:`from_dict`. Pass an errors list to collect them.
+        """
+        instance = cls()
+        instance._load(raw_data, ValidationContext.from_kwargs(kwargs))
+        return instance
+
+    @classmethod
+    def view(cls, raw_data, **kwargs):
+        """
+        Creates a view of raw_data, a dict in the format accepted by
+        populate. Nothing is copied: fields are read from raw_data on demand
+        through the source map of the class, wrapped models are returned as
+        views of their raw dicts and cached. Scalar fields return the raw,
+        unconverted values. validate checks a view without storing converted
+        values, serialize writes them converted as validate does; a view is
+        never serialized as trusted. Assignments are stored on the view,
+        raw_data is never modified. The name_spaces and clark_names options
+        of populate apply.
+        """
+        instance = cls._blank()
+        name_spaces = kwargs.get('name_spaces')
+        clark_names = kwargs.get('clark_names')
+        source_to_key = instance._source_to_key(name_spaces, clark_names)
+        key_to_source = instance._meta.source_maps[
+            instance._name_spaces_key(name_spaces, clark_names)][1]
+        instance.__dict__.update(_raw=raw_data, _view_sources=key_to_source,
+                                 _view_keys_map=source_to_key,
+                                 _view_options=dict(name_spaces=name_spaces,
+                                                    clark_names=clark_names))
+        return instance
+
+    def _view_value(self, key):
+        field = self._clsfields.get(key)
+        if field is None:
+            if key in self._view_keys_map:
+                return None
+            return self._raw.get(key)
+        source = self._view_sources[key]
+        value = self._raw.get(source)
+        if not isinstance(field, WrappedObjectField) or \
+                not isinstance(field._wrapped_class, ModelType):
+            return value
+        if value is None:
+            # As populate, accept_none fields with a None value hold an
+            # empty instance.
+            if not field.accept_none or source not in self._raw:
+                return None
+            value = {}
+        if isinstance(field, ModelField):
+            value = self._child_view(field, value)
+        else:
+            if not isinstance(value, list):
+                value = [value]
+            value = [self._child_view(field, item) for item in value]
+        self._data[key] = value
+        return value
+
+    def _child_view(self, field, value):
+        if not isinstance(value, dict):
+            value = {'#text': value}
+        return field._wrapped_class.view(value, **self._view_options)
+
+    def _field_value(self, key):
+        value = self._data.get(key)
+        if value is None and self._raw is not None:
+            value = self._view_value(key)
+        return value
+
+    def _view_keys(self):
+        """Returns the keys of the fields with a value in the raw dict."""
+        raw = self._raw
+        return [key for source, key in self._view_keys_map.items()
+                if raw.get(source) is not None or source in raw and
+                getattr(self._clsfields[key], 'accept_none', False)]
+
+    def _view_extra(self):
+        return dict((key, value) for key, value in self._raw.items()
+                    if key not in self._view_keys_map)
+
+    @classmethod
+    def _blank(cls):
+        """Returns an empty instance without running __init__."""
+        instance = cls.__new__(cls)
+        instance.__dict__.update(_extra={}, _data={}, _path='',
+                                 _non_empty_fields=set([]))
+        return instance
+
+    def clone(self):
+        """
+        Returns a copy-on-write clone of this instance. The clone and the
+        original share _data and _extra until one of them is modified or
+        one of its nested models or lists is read; that instance then copies
+        its tables and clones the nested models, which are copy-on-write
+        clones themselves. Changes made through either instance are not
+        visible in the other one.
+        """
+        tables = self._tables
+        if tables is None:
+            tables = self.__dict__['_tables'] = [1]
+        tables[0] += 1
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        for key in ('_frozen', '_hash_cache', '_hash_parents'):
+            clone.__dict__.pop(key, None)
+        return clone
+
+    def _before_write(self):
+        self._own_data()
+        self.__dict__.pop('_validated', None)
+        self._invalidate_hash()
+
+    def _own_data(self):
+        # _tables counts the instances sharing _data, _extra and
+        # _non_empty_fields, the last one keeps them.
+        tables = self._tables
+        if tables is None:
+            return
+        self.__dict__['_tables'] = None
+        if tables[0] == 1:
+            return
+        tables[0] -= 1
+        data = dict((key, _clone_value(value))
+                    for key, value in self._data.items())
+        self.__dict__.update(_data=data, _extra=dict(self._extra),
+                             _non_empty_fields=set(self._non_empty_fields))
+        if self._hash_cache is not None:
+            # the cached hash must be cleared by writes to the clones
+            for value in data.values():
+                _structural_hash(value, self)
+
+    def _gen_key_to_from_source(self, name_spaces, clark_names=False):
+        ns_key = self._name_spaces_key(name_spaces, clark_names)
+        self._meta.source_to_key = self._source_to_key(name_spaces,
+                                                       clark_names)
+        self._meta.key_to_source = self._meta.source_maps[ns_key][1]
+
+    @staticmethod
+    def _name_spaces_key(name_spaces, clark_names=False):
+        if clark_names:
+            return _CLARK
+        if not name_spaces:
+            return None
+        return tuple(sorted(name_spaces.items()))
+
+    def _source_to_key(self, name_spaces, clark_names=False):
+        """Returns the {source: key} map for name_spaces or, with clark_names,
+        for sources in Clark notation. The maps and their inverse are built
+        once per class and name space prefixes."""
+        ns_key = self._name_spaces_key(name_spaces, clark_names)
+        maps = self._meta.source_maps.get(ns_key)
+        if maps is None:
+            source_to_key = {}
+            default_prefix = ''
+            default_ns = getattr(self._meta, 'name_space', None)
+            if name_spaces and default_ns in name_spaces:
+                default_prefix = ''.join([name_spaces[default_ns], ':'])
+            for key, field in self._clsfields.items():
+                if clark_names:
+                    source = clark_name(field.name_space or default_ns,
+                                        field.get_source(key))
+                else:
+                    source = field.get_source(key, name_spaces,
+                                              default_prefix)
+                source_to_key[source] = key
+            key_to_source = dict(
+                [(value, key) for key, value in source_to_key.items()])
+            maps = self._meta.source_maps[ns_key] = (source_to_key,
+                                                     key_to_source)
+        return maps[0]
 
     def _find_field(self, name):
         if name in self._meta.source_to_key:
@@ -275,21 +720,18 @@ class Model(with_metaclass(ModelType)):
             if key in self._fields:
                 return key
 
-    def _build_path(self, **kwargs):
-        path = kwargs.get('path', '')
-        index = kwargs.get('instance_index')
-        if path:
-            base_path = ''.join([path, '.', self.__class__.__name__])
-        else:
-            base_path = self.__class__.__name__
-        if index is not None:
-            base_path = ''.join([base_path, '[', str(index), ']'])
-            kwargs['instance_index'] = None
-        return base_path
+    def _build_path(self, context):
+        return ModelPath(context.path, self.__class__.__name__,
+                         context.instance_index)
 
     def populate(self, data, **kwargs):
-        name_spaces = kwargs.get('name_spaces')
-        self._gen_key_to_from_source(name_spaces)
+        self._populate(data, ValidationContext.from_kwargs(kwargs))
+
+    def _populate(self, data, context):
+        self._before_write()
+        string_intern = context.get('string_intern')
+        self._gen_key_to_from_source(context.get('name_spaces'),
+                                     context.get('clark_names'))
         for name, value in data.items():
             key = self._find_field(name)
             if key:
@@ -298,71 +740,199 @@ class Model(with_metaclass(ModelType)):
                     if key is not None:
                         self._non_empty_fields.add(key)
                 if isinstance(field, WrappedObjectField):
-                    self._data[key] = field.populate(value, **kwargs)
+                    self._data[key] = field._populate_object(value, context)
+                elif string_intern is not None:
+                    self._data[key] = string_intern.intern(value)
                 else:
                     self._data[key] = value
             else:
+                if string_intern is not None:
+                    name = string_intern.intern(name)
+                self._extra[name] = value
+
+    def _load(self, data, context):
+        """populate, validate and deserialize of data in one pass."""
+        error_count = len(context.errors)
+        self._before_write()
+        self._path = self._build_path(context)
+        context.push(self._path)
+        self._load_values(data, context)
+        context.pop()
+        self._validated = len(context.errors) == error_count
+
+    def _load_values(self, data, context):
+        string_intern = context.get('string_intern')
+        self._gen_key_to_from_source(context.get('name_spaces'),
+                                     context.get('clark_names'))
+        source_to_key = self._meta.source_to_key
+        clsfields = self._clsfields
+        values = {}
+        for name, value in data.items():
+            key = source_to_key.get(name)
+            if key is not None:
+                if value is not None or \
+                        getattr(clsfields[key], 'accept_none', False):
+                    self._non_empty_fields.add(key)
+                values[key] = value
+            else:
+                if string_intern is not None:
+                    name = string_intern.intern(name)
                 self._extra[name] = value
+        kwargs = context.kwargs
+        for key, field in clsfields.items():
+            if key not in values:
+                continue
+            value = values[key]
+            if isinstance(field, WrappedObjectField):
+                self._data[key] = field._load_object(value, context)
+                continue
+            if value is not None:
+                ok, result = field.load(value, **kwargs)
+                if ok:
+                    value = result
+                    if string_intern is not None:
+                        value = string_intern.intern_value(value)
+                else:
+                    if string_intern is not None:
+                        value = string_intern.intern(value)
+                    msg_rec = MsgRecord(path=self._path, field=key, msg=result)
+                    context.error(logger, msg_rec)
+            self._data[key] = value
+        if self._extra:
+            self._validate_extra(context)
 
     def validate(self, **kwargs):
-        self._path = self._build_path(**kwargs)
+        return self._validate(ValidationContext.from_kwargs(kwargs))
+
+    def _validate(self, context):
+        error_count = len(context.errors)
+        self._before_write()
+        self._path = self._build_path(context)
+        context.push(self._path)
+        self._validate_values(context)
+        context.pop()
+        # the raw values of views are not converted, see _serialize
+        self._validated = self._raw is None and \
+            len(context.errors) == error_count
+        return self
+
+    def _validate_values(self, context):
+        string_intern = context.get('string_intern')
+        kwargs = context.kwargs
+        view = self._raw is not None
         for key, field in self._clsfields.items():
             data = self._data.get(key)
-            if data is not None:
-                try:
-                    kwargs['path'] = self._path
-                    self._data[key] = field.validate(data, **kwargs)
-                except ValidationException as e:
-                    msg_rec = MsgRecord(path=self._path, field=key, msg=e.msg)
-                    error(logger, msg_rec, **kwargs)
-        if self._extra:
-            extra_attributes = [key for key in self._extra.keys()
-                                if key.startswith('@')]
-            extra_elements = [key for key in self._extra.keys()
-                              if key not in extra_attributes]
-            if extra_attributes and not self._meta.allow_extra_attributes:
-                attrs_str = ','.join(extra_attributes)
-                msg = 'Found extra attribute fields: %s' % attrs_str
-                msg_rec = MsgRecord(path=self._path, field='_extra', msg=msg)
-                error(logger, msg_rec, **kwargs)
-            if extra_elements and not self._meta.allow_extra_elements:
-                els_str = ','.join(extra_elements)
-                msg = 'Found extra element fields: %s' % els_str
-                msg_rec = MsgRecord(path=self._path, field='_extra', msg=msg)
-                error(logger, msg_rec, **kwargs)
-        return self
+            if data is None and view:
+                data = self._view_value(key)
+            if data is None:
+                continue
+            if isinstance(field, WrappedObjectField):
+                self._data[key] = field._validate_object(data, context)
+                continue
+            ok, value = field.check(data, **kwargs)
+            if ok:
+                if string_intern is not None:
+                    value = string_intern.intern_value(value)
+                if not view:
+                    self._data[key] = value
+            else:
+                msg_rec = MsgRecord(path=self._path, field=key, msg=value)
+                context.error(logger, msg_rec)
+        if self._extra or view:
+            self._validate_extra(context)
+
+    def _validate_extra(self, context):
+        extra = list(self._extra.keys())
+        if self._raw is not None:
+            extra.extend(self._view_extra())
+        extra_attributes = [key for key in extra if key.startswith('@')]
+        extra_elements = [key for key in extra
+                          if key not in extra_attributes]
+        if extra_attributes and not self._meta.allow_extra_attributes:
+            attrs_str = ','.join(extra_attributes)
+            msg = 'Found extra attribute fields: %s' % attrs_str
+            msg_rec = MsgRecord(path=self._path, field='_extra', msg=msg)
+            context.error(logger, msg_rec)
+        if extra_elements and not self._meta.allow_extra_elements:
+            els_str = ','.join(extra_elements)
+            msg = 'Found extra element fields: %s' % els_str
+            msg_rec = MsgRecord(path=self._path, field='_extra', msg=msg)
+            context.error(logger, msg_rec)
 
     def deserialize(self, **kwargs):
+        return self._deserialize(ValidationContext.from_kwargs(kwargs))
+
+    def _deserialize(self, context):
+        error_count = len(context.errors)
+        self._before_write()
+        context.push(self._path)
+        kwargs = context.kwargs
         for key, field in self._fields.items():
             data = self._data.get(key)
             if data is not None:
                 try:
-                    kwargs['path'] = self._path
-                    self._data[key] = field.deserialize(data, **kwargs)
+                    if isinstance(field, WrappedObjectField):
+                        self._data[key] = field._deserialize_object(data,
+                                                                    context)
+                    else:
+                        self._data[key] = field.deserialize(data, **kwargs)
                 except ValidationException as e:
-                    msg_rec = MsgRecord(path=self._path, field=key, msg=e.msg)
-                    error(logger, msg_rec, **kwargs)
+                    msg_rec = MsgRecord(path=self._path, field=key,
+                                        msg=e.lazy_msg)
+                    context.error(logger, msg_rec)
+        context.pop()
+        self._validated = self._raw is None and \
+            len(context.errors) == error_count
         return self
 
     def serialize(self, **kwargs):
-        name_spaces = kwargs.get('name_spaces')
-        dict_constructor = kwargs.get('dict_constructor', dict)
-        self._gen_key_to_from_source(name_spaces)
+        """
+        Returns the serialized dict of the instance. With trusted=True the
+        values of instances validated and unchanged since are serialized
+        without validating them again, see
+        :meth:`~xmodels.fields.BaseField.dump`.
+        """
+        return self._serialize(ValidationContext.from_kwargs(kwargs))
+
+    def _serialize(self, context):
+        dict_constructor = context.get('dict_constructor', dict)
+        trusted = context.get('trusted') and self._validated
+        self._gen_key_to_from_source(context.get('name_spaces'),
+                                     context.get('clark_names'))
+        context.push(self._path)
+        kwargs = context.kwargs
+        view_values = () if self._raw is None else set(self._view_keys())
         result = dict_constructor()
         for key, value in self._get_fields_items():
             field = self._fields[key]
+            if value is not None and key in view_values and \
+                    key not in self._data:
+                # raw values of views are serialized as validate converts
+                # them, invalid ones are left to field.serialize
+                ok, checked = field.check(value, **kwargs)
+                if ok:
+                    value = checked
             if value is not None:
                 try:
-                    kwargs['path'] = self._path
                     serialized_key = self._meta.key_to_source[key]
-                    serialized_data = field.serialize(value, **kwargs)
+                    if isinstance(field, WrappedObjectField):
+                        serialized_data = field._serialize_object(
+                            value, context, trusted)
+                    elif trusted:
+                        serialized_data = field.dump(value, **kwargs)
+                    else:
+                        serialized_data = field.serialize(value, **kwargs)
                     if serialized_data == {}:
                         result[serialized_key] = None
                     else:
                         result[serialized_key] = serialized_data
                 except ValidationException as e:
-                    msg_rec = MsgRecord(path=self._path, field=key, msg=e.msg)
-                    error(logger, msg_rec, **kwargs)
+                    msg_rec = MsgRecord(path=self._path, field=key,
+                                        msg=e.lazy_msg)
+                    context.error(logger, msg_rec)
+        context.pop()
+        if self._raw is not None:
+            result.update(self._view_extra())
         result.update(self._extra)
         return result
 
@@ -373,6 +943,9 @@ class Model(with_metaclass(ModelType)):
         return dict(self._clsfields)
 
     def _get_fields_items(self):
+        if self._raw is not None:
+            return [(key, self._field_value(key)) for key in
+                    set(self._view_keys()) | set(self._data)]
         return list(self._data.items())
 
 
@@ -380,27 +953,49 @@ class AttributeModel(Model):
     """Used to describe elements with attributes, an optional
     text value and no children. The key value  used
     for the xml text #text is controlled by Meta.value_key.
+
+    Identical attribute models may be shared between parents when a
+    :class:`~xmodels.interning.ModelInternTable` is passed as model_intern
+    to populate. Shared instances are frozen.
     """
+    _internable = True
+
     class Meta:
         value_key = 'value'
         required_attributes = None
 
     def __init__(self):
         super(AttributeModel, self).__init__()
-        if self._meta.required_attributes is None:
-            self._meta.required_attributes = []
+        self._clsfields = self._attribute_fields()
+
+    @classmethod
+    def _attribute_fields(cls):
+        """Returns the class fields wrapped as attribute fields. The wrapped
+        table is built once per class and shared by all instances."""
+        cls_fields = cls.__dict__.get('_wrapped_fields')
+        if cls_fields is not None:
+            return cls_fields
+        if cls._meta.required_attributes is None:
+            cls._meta.required_attributes = []
         cls_fields = {}
-        for name, field in self._clsfields.items():
-            if name == self._meta.value_key:
-                cls_fields[name] = self._clsfields[name]
+        for name, field in cls._clsfields.items():
+            if name == cls._meta.value_key:
+                cls_fields[name] = cls._clsfields[name]
                 if not cls_fields[name].source:
                     cls_fields[name].source = '#text'
             else:
-                if name in self._meta.required_attributes:
+                if name in cls._meta.required_attributes:
                     cls_fields[name] = RequiredAttribute(field)
                 else:
                     cls_fields[name] = AttributeField(field)
-        self._clsfields = cls_fields
+        cls._wrapped_fields = cls_fields
+        return cls_fields
+
+    @classmethod
+    def _blank(cls):
+        instance = super(AttributeModel, cls)._blank()
+        instance.__dict__['_clsfields'] = cls._attribute_fields()
+        return instance
 
 
 class SequenceModel(Model):
@@ -421,62 +1016,112 @@ class SequenceModel(Model):
         super(SequenceModel, self).__init__()
         self._data_sequence = None
 
-    def validate(self, **kwargs):
-        self._path = self._build_path(**kwargs)
+    def __reduce__(self):
+        unpickle, args = super(SequenceModel, self).__reduce__()
+        return unpickle, args[:4] + (self._data_sequence,) + args[5:]
+
+    @classmethod
+    def _blank(cls):
+        instance = super(SequenceModel, cls)._blank()
+        instance.__dict__['_data_sequence'] = None
+        return instance
+
+    def _load_values(self, data, context):
+        self._init_stores(context)
+        super(SequenceModel, self)._load_values(data, context)
+        self._match_data_sequence(context)
+
+    def _validate_values(self, context):
+        self._init_stores(context)
+        super(SequenceModel, self)._validate_values(context)
+        self._match_data_sequence(context)
+
+    def _init_stores(self, context):
         if self._meta.initial is not None:
-            if kwargs.get('stores') is None:
-                kwargs['stores'] = Stores()
+            if context.stores is None:
+                context.stores = Stores()
             self._meta.initial.add_keys(path=self._path,
-                                        stores=kwargs['stores'])
-        super(SequenceModel, self).validate(**kwargs)
+                                        stores=context.stores)
+
+    def _match_data_sequence(self, context):
         element_tags = []
-        for tag in self._non_empty_fields:
-            if tag in self._fields and self._data[tag] is not None:
+        non_empty_fields = self._non_empty_fields
+        if self._raw is not None:
+            non_empty_fields = non_empty_fields | set(self._view_keys())
+        for tag in non_empty_fields:
+            if tag in self._fields and self._field_value(tag) is not None:
                 field = self._fields[tag]
                 if not field.isAttribute:
                     element_tags.append(tag)
-        self._data_sequence = self.match_sequence(element_tags, **kwargs)
+        # Missing keys are reported with the path of the parent.
+        self._data_sequence = self._match_sequence(element_tags, context,
+                                                   self._path.parent)
 
     def match_sequence(self, value_tags, **kwargs):
+        context = ValidationContext.from_kwargs(kwargs)
+        return self._match_sequence(value_tags, context, context.path)
+
+    def _match_sequence(self, value_tags, context, path):
+        if self._meta.sequence is None:
+            # without Meta.sequence the elements may occur in any order
+            return list(value_tags)
         result_sequence = []
-        path = kwargs.get('path', '')
         for field in self._meta.sequence:
             if isinstance(field, SequenceElement):
                 if field.tag in value_tags:
                     result_sequence.append(field.tag)
                 elif field.required:
-                    msg = "Missing required key: %s %s" % (field.tag, path)
+                    msg = Message("Missing required key: %s %s",
+                                  (field.tag, path))
                     msg_rec = MsgRecord(path=self._path, field=field.tag,
                                         msg=msg)
-                    error(logger, msg_rec, **kwargs)
+                    context.error(logger, msg_rec)
             elif isinstance(field, Choice):
                 choice_keys_sey = set(value_tags) & field.all_keys_set
-                cs = field.match_choice_keys(choice_keys_sey, **kwargs)
+                cs = field._match_choice_keys(choice_keys_sey, context)
                 if cs:
                     result_sequence.extend(cs)
         extra_tags = [tag for tag in value_tags if tag not in result_sequence]
         if extra_tags:
-            msg = "Could not match tag(s): %s" % ', '.join(extra_tags)
+            msg = Message("Could not match tag(s): %s",
+                          _Deferred(', '.join, extra_tags))
             msg_rec = MsgRecord(path=self._path, field='_extra', msg=msg)
-            error(logger, msg_rec, **kwargs)
+            context.error(logger, msg_rec)
         return result_sequence
 
     def _get_fields_items(self):
-        attribute_keys = set(self._data.keys()) - set(self._data_sequence)
-        attributes = [(key, self._data[key]) for key in attribute_keys]
-        elements = [(key, self._data[key]) for key in self._data_sequence]
+        items = super(SequenceModel, self)._get_fields_items()
+        if self._data_sequence is None:
+            # not validated or matched yet
+            return items
+        values = dict(items)
+        attribute_keys = set(values) - set(self._data_sequence)
+        attributes = [(key, values[key]) for key in attribute_keys]
+        elements = [(key, values[key]) for key in self._data_sequence]
         return attributes + elements
 
     def from_xml(self, raw_data, **kwargs):
+        """Populates the instance from raw_data, a dict with a single root key
+        as created by xmltodict. With clark_names the element and attribute
+        names are normalized to Clark notation {uri}local, the result does not
+        depend on the prefixes the document uses."""
+        if kwargs.get('clark_names'):
+            root_data = next(iter(to_clark(raw_data).values()))
+            root_data.pop(_XSI_SCHEMA_LOCATION, None)
+            kwargs['errors'] = []
+            return self.populate(root_data, **kwargs)
         name_spaces = kwargs.get('name_spaces', {})
         keys_to_delete = []
         root_data = next(iter(raw_data.values()))
         for key, value in root_data.items():
-            if key.startswith('@xmlns'):
+            if key == '@xmlns':
+                # Elements of the default name space have no prefix.
+                keys_to_delete.append(key)
+            elif key.startswith('@xmlns:'):
                 name_spaces[value] = key.split(':')[1]
                 keys_to_delete.append(key)
-        if 'http://www.w3.org/2001/XMLSchema-instance' in name_spaces:
-            xsi = name_spaces['http://www.w3.org/2001/XMLSchema-instance']
+        if XSI_NS in name_spaces:
+            xsi = name_spaces[XSI_NS]
             schema_location_attr = '@%s:schemaLocation' % xsi
             if schema_location_attr in root_data:
                 keys_to_delete.append(schema_location_attr)
@@ -489,3 +1134,46 @@ class SequenceModel(Model):
     def serialize(self, **kwargs):
         # FIXME generate sequence
         return super(SequenceModel, self).serialize(**kwargs)
+
+
+def load(raw_data, **kwargs):
+    """
+    Creates and validates an instance of the model class registered for the
+    root element of raw_data, a dict with a single root key as created by
+    xmltodict. The class is looked up by the name space URI of the root
+    element, declared in its @xmlns attributes, and its local name. Pass an
+    errors list to collect the validation errors. With clark_names the
+    document is normalized to Clark notation, see
+    :meth:`SequenceModel.from_xml`.
+
+    :raises ValidationException: if no model class is registered for the
+        root element
+    """
+    clark_names = kwargs.get('clark_names')
+    if clark_names:
+        raw_data = to_clark(raw_data)
+    root_key, root_data = next(iter(raw_data.items()))
+    if root_key.startswith('{'):
+        name_space, _, root_tag = root_key[1:].partition('}')
+    else:
+        prefix, _, root_tag = root_key.rpartition(':')
+        xmlns = '@xmlns:%s' % prefix if prefix else '@xmlns'
+        name_space = root_data.get(xmlns) \
+            if isinstance(root_data, dict) else None
+    model_class = get_root_model(name_space, root_tag)
+    if model_class is None:
+        raise ValidationException('No model class registered for root '
+                                  'element.', root_key)
+    kwargs.setdefault('errors', [])
+    instance = model_class()
+    if clark_names:
+        root_data.pop(_XSI_SCHEMA_LOCATION, None)
+        instance.populate(root_data, **kwargs)
+    elif isinstance(instance, SequenceModel):
+        name_spaces = dict(kwargs.pop('name_spaces', None) or {})
+        instance.from_xml(raw_data, name_spaces=name_spaces, **kwargs)
+        kwargs['name_spaces'] = name_spaces
+    else:
+        instance.populate(root_data, **kwargs)
+    instance.validate(**kwargs)
+    return instance
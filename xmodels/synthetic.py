@@ -0,0 +1,423 @@
+"""
+Synthetic documents of any size for load and soak tests.
+
+:func:`generate` returns a raw dict for a model class in the format accepted
+by populate and from_dict. Values are generated from the field types and
+their facets; Meta.sequence, Choice options, required attributes and
+required fields are respected, so the document validates without errors.
+Values of a RegexField are generated from its regex, ValueError is raised if
+it uses unsupported constructs such as backreferences or lookarounds::
+
+    raw = generate(AbstractDefinition, items=100, depth=5,
+                   name_spaces=name_spaces)
+    AbstractDefinition.from_dict(raw, name_spaces=name_spaces, errors=errors)
+
+Every ModelCollectionField and FieldCollectionField holds items values up
+to depth nested models, a document has about items ** depth instances.
+IDREF values refer to the ID values of the document, references sets the
+probability that an optional IDREF is generated. With invalid > 0 values
+are replaced by invalid ones, or unknown elements added, with that
+probability; :attr:`DocumentGenerator.injected` counts them.
+
+:meth:`DocumentGenerator.document` wraps the raw dict in its root element
+with the name space declarations, as accepted by from_xml and
+:func:`~xmodels.models.load`, :func:`to_xml` writes such a document as XML.
+"""
+import datetime
+import random
+import string
+from xml.sax.saxutils import escape, quoteattr
+
+from six import string_types, unichr
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from .constraints import ID, IDREF
+from .fields import AttributeField, BooleanField, DateField, \
+    DateTimeField, EnumField, FieldCollectionField, FloatField, \
+    Language, ModelCollectionField, ModelField, RangeField, RegexField, \
+    TimeField, WrappedObjectField
+from .models import Choice, ModelType, SequenceElement, SequenceModel
+
+# values tried in turn to make a field invalid
+_INVALID_VALUES = ('#invalid value#', 'not a number', '-1', '')
+_BASE_TIME = datetime.datetime(2014, 11, 2, 10, 0, 0)
+# tries to generate a value matching the regex of a RegexField
+_PATTERN_TRIES = 20
+# characters generated for ., negated sets and categories
+_PRINTABLE = string.ascii_letters + string.digits + '_-.:'
+_CATEGORIES = {
+    sre_parse.CATEGORY_DIGIT: string.digits,
+    sre_parse.CATEGORY_NOT_DIGIT: string.ascii_letters,
+    sre_parse.CATEGORY_WORD: string.ascii_letters + string.digits + '_',
+    sre_parse.CATEGORY_NOT_WORD: '-.:',
+    sre_parse.CATEGORY_SPACE: ' ',
+    sre_parse.CATEGORY_NOT_SPACE: _PRINTABLE,
+}
+
+
+def _field_instance(field):
+    while isinstance(field, AttributeField):
+        field = field.field_instance
+    return field
+
+
+def _required(field):
+    return bool(getattr(_field_instance(field), 'required', False))
+
+
+class _Reference(object):
+    """Placeholder of an IDREF value until all IDs are generated."""
+    __slots__ = ()
+
+
+class DocumentGenerator(object):
+    """
+    Generates raw dicts of model classes, see :mod:`xmodels.synthetic`.
+
+    :param int items: items of every collection field, limited by the
+        min_occurs and max_occurs of its SequenceElement
+    :param int depth: nesting depth of optional models, required models are
+        generated below it with their required fields only
+    :param float optional: probability that an optional field is generated
+    :param float references: probability that an optional IDREF field is
+        generated
+    :param float invalid: probability that a value or an unknown element
+        is injected to make the document invalid
+    :param seed: seed of the random generator, documents generated with
+        the same seed and parameters are equal
+    :param dict name_spaces: {uri: prefix} of the source keys
+    """
+
+    def __init__(self, items=3, depth=3, optional=1.0, references=0.5,
+                 invalid=0.0, seed=0, name_spaces=None):
+        self.items = items
+        self.depth = depth
+        self.optional = optional
+        self.references = references
+        self.invalid = invalid
+        self.name_spaces = name_spaces
+        self.random = random.Random(seed)
+        self.injected = 0
+        self._counter = 0
+        self._ids = []
+        self._idrefs = []
+
+    def generate(self, model_class):
+        """Returns a raw dict for an instance of model_class."""
+        self._ids = []
+        self._idrefs = []
+        raw = self._model(model_class, self.depth)
+        if self._idrefs:
+            self._resolve_idrefs(raw)
+        return raw
+
+    def document(self, model_class):
+        """Returns {root tag: raw dict} with the name space declarations of
+        the root element."""
+        raw = self.generate(model_class)
+        meta = model_class._meta
+        tag = getattr(meta, 'root_tag', None) or model_class.__name__
+        prefixes = self.name_spaces or {}
+        name_space = getattr(meta, 'name_space', None)
+        if name_space in prefixes:
+            tag = '%s:%s' % (prefixes[name_space], tag)
+        declarations = [('@xmlns:%s' % prefix, uri)
+                        for uri, prefix in sorted(prefixes.items())]
+        root = dict(declarations)
+        root.update(raw)
+        return {tag: root}
+
+    def _next(self):
+        self._counter += 1
+        return self._counter
+
+    def _chance(self, probability):
+        return probability >= 1 or self.random.random() < probability
+
+    def _model(self, model_class, depth):
+        instance = model_class._blank()
+        fields = instance._clsfields
+        instance._source_to_key(self.name_spaces)
+        key_to_source = model_class._meta.source_maps[
+            instance._name_spaces_key(self.name_spaces)][1]
+        raw = {}
+        for key, min_occurs, max_occurs in self._keys(model_class, fields):
+            field = fields[key]
+            required = min_occurs > 0 or _required(field)
+            if not required:
+                if depth <= 0 and isinstance(field, WrappedObjectField):
+                    continue
+                probability = self.references if isinstance(
+                    _field_instance(field), IDREF) else self.optional
+                if not self._chance(probability):
+                    continue
+            value = self._value(field, depth, min_occurs, max_occurs,
+                                required)
+            if value is not None:
+                raw[key_to_source[key]] = value
+        if self.invalid and self._chance(self.invalid) and \
+                not model_class._meta.allow_extra_elements:
+            raw['unknown%d' % self._next()] = 'invalid'
+            self.injected += 1
+        return raw
+
+    def _keys(self, model_class, fields):
+        """Yields (key, min_occurs, max_occurs) of the fields to generate:
+        the attributes and the elements of one match of Meta.sequence."""
+        sequence = model_class._meta.sequence
+        if not issubclass(model_class, SequenceModel) or sequence is None:
+            for key in model_class._field_names:
+                if key in fields:
+                    yield key, 0, 0
+            return
+        for key in model_class._field_names:
+            if fields[key].isAttribute:
+                yield key, 0, 0
+        for item in sequence:
+            if isinstance(item, Choice):
+                if not item.required and not self._chance(self.optional):
+                    continue
+                option = self.random.choice(item.options)
+                if isinstance(option, SequenceElement):
+                    option = [option]
+                for element in option:
+                    yield element.tag, element.min_occurs, element.max_occurs
+            elif isinstance(item, SequenceElement):
+                yield item.tag, item.min_occurs, item.max_occurs
+
+    def _count(self, min_occurs, max_occurs):
+        count = max(self.items, min_occurs, 1)
+        if max_occurs > 0:
+            count = min(count, max_occurs)
+        return count
+
+    def _value(self, field, depth, min_occurs, max_occurs, required):
+        if isinstance(field, ModelCollectionField):
+            if not isinstance(field._wrapped_class, ModelType):
+                return None
+            count = self._count(min_occurs, max_occurs)
+            if depth <= 0:
+                count = max(min_occurs, 1)
+            return [self._model(field._wrapped_class, depth - 1)
+                    for _ in range(count)]
+        if isinstance(field, ModelField):
+            if not isinstance(field._wrapped_class, ModelType):
+                return None
+            return self._model(field._wrapped_class, depth - 1)
+        if isinstance(field, FieldCollectionField):
+            return [self._simple(field._instance, required)
+                    for _ in range(self._count(min_occurs, max_occurs))]
+        return self._simple(_field_instance(field), required)
+
+    def _simple(self, field, required):
+        if self.invalid and self._chance(self.invalid):
+            value = self._invalid(field)
+            if value is not None:
+                self.injected += 1
+                return value
+        if isinstance(field, IDREF):
+            return self._idref()
+        value = self._valid(field)
+        if isinstance(field, ID):
+            self._ids.append(value)
+        return value
+
+    def _valid(self, field):
+        number = self._next()
+        if isinstance(field, EnumField):
+            return self.random.choice(field.options)
+        if isinstance(field, BooleanField):
+            return self.random.choice(('true', 'false'))
+        if isinstance(field, RangeField):
+            return self._number(field)
+        if isinstance(field, DateTimeField):
+            value = _BASE_TIME + datetime.timedelta(seconds=number)
+            if isinstance(field, DateField):
+                value = value.date()
+            elif isinstance(field, TimeField):
+                value = value.time()
+            return field.dump(value)
+        if isinstance(field, Language):
+            return 'en'
+        value = self._string(field, number)
+        if isinstance(field, RegexField) and not field.check(value)[0]:
+            value = self._pattern(field)
+        return value
+
+    def _number(self, field):
+        low, high = field.min, field.max
+        if low is None:
+            low = 0 if high is None or high >= 0 else high - 1000
+        if high is None:
+            high = low + 1000
+        if isinstance(field, FloatField):
+            return '%.3f' % self.random.uniform(low, high)
+        return str(self.random.randint(int(low), int(high)))
+
+    def _string(self, field, number):
+        value = 'id%d' % number if isinstance(field, ID) else 'v%d' % number
+        min_length = getattr(field, 'minLength', None) or 0
+        max_length = getattr(field, 'maxLength', None)
+        length = getattr(field, 'length', None)
+        if length is not None:
+            min_length = max_length = length
+        if len(value) < min_length:
+            value = value + 'x' * (min_length - len(value))
+        if max_length is not None and len(value) > max_length:
+            value = value[-max_length:]
+            if not value[:1].isalpha():
+                value = 'v' + value[1:]
+        return value
+
+    def _pattern(self, field):
+        """Returns a value matching the regex of field, ValueError if the
+        regex is not supported or no value passes the other facets."""
+        pattern = sre_parse.parse(field.regex)
+        for _ in range(_PATTERN_TRIES):
+            value = self._regex_string(pattern, field.regex)
+            if field.check(value)[0]:
+                return value
+        raise ValueError('Cannot generate a value of %s matching %r' %
+                         (field.__class__.__name__, field.regex))
+
+    def _regex_string(self, items, regex):
+        parts = []
+        for op, av in items:
+            if op == sre_parse.LITERAL:
+                parts.append(unichr(av))
+            elif op == sre_parse.NOT_LITERAL:
+                parts.append(self.random.choice(
+                    [c for c in _PRINTABLE if c != unichr(av)]))
+            elif op == sre_parse.ANY:
+                parts.append(self.random.choice(_PRINTABLE))
+            elif op == sre_parse.IN:
+                parts.append(self.random.choice(self._regex_set(av, regex)))
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                low, high, sub = av
+                count = self.random.randint(low, min(high, low + 3))
+                parts.extend(self._regex_string(sub, regex)
+                             for _ in range(count))
+            elif op == sre_parse.SUBPATTERN:
+                # (group, sub) or (group, add_flags, del_flags, sub)
+                parts.append(self._regex_string(av[-1], regex))
+            elif op == sre_parse.BRANCH:
+                parts.append(self._regex_string(
+                    self.random.choice(av[1]), regex))
+            elif op != sre_parse.AT:
+                raise ValueError('Cannot generate a value matching %r' %
+                                 regex)
+        return ''.join(parts)
+
+    def _regex_set(self, items, regex):
+        """Returns the characters of a character set."""
+        chars = []
+        negate = False
+        for op, av in items:
+            if op == sre_parse.NEGATE:
+                negate = True
+            elif op == sre_parse.LITERAL:
+                chars.append(unichr(av))
+            elif op == sre_parse.RANGE:
+                chars.extend(unichr(code) for code in range(av[0], av[1] + 1))
+            elif op == sre_parse.CATEGORY and av in _CATEGORIES:
+                chars.extend(_CATEGORIES[av])
+            else:
+                raise ValueError('Cannot generate a value matching %r' %
+                                 regex)
+        if negate:
+            chars = [c for c in _PRINTABLE if c not in set(chars)]
+        return chars
+
+    def _invalid(self, field):
+        """Returns a value the field rejects or None."""
+        max_length = getattr(field, 'maxLength', None)
+        candidates = list(_INVALID_VALUES)
+        if max_length is not None:
+            candidates.insert(0, 'x' * (max_length + 1))
+        for value in candidates:
+            if not field.check(value)[0]:
+                return value
+
+    def _idref(self):
+        reference = _Reference()
+        self._idrefs.append(reference)
+        return reference
+
+    def _resolve_idrefs(self, value):
+        # IDREF values are filled in after all IDs of the document are
+        # known, so references may point forward.
+        if isinstance(value, _Reference):
+            if not self._ids:
+                return IDREF.default_build_value
+            return self.random.choice(self._ids)
+        if isinstance(value, dict):
+            for key, item in value.items():
+                value[key] = self._resolve_idrefs(item)
+        elif isinstance(value, list):
+            value[:] = [self._resolve_idrefs(item) for item in value]
+        return value
+
+
+def generate(model_class, **kwargs):
+    """Returns a raw dict for an instance of model_class, the keyword
+    arguments are those of :class:`DocumentGenerator`."""
+    return DocumentGenerator(**kwargs).generate(model_class)
+
+
+def to_xml(document, indent='  '):
+    """
+    Returns document, a dict with a single root key as created by xmltodict
+    or :meth:`DocumentGenerator.document`, as XML text. Keys starting with
+    '@' are written as attributes, '#text' as text, lists as repeated
+    elements.
+    """
+    lines = ['<?xml version="1.0" encoding="utf-8"?>']
+    for tag, value in document.items():
+        _write_element(lines, tag, value, indent, 0)
+    return '\n'.join(lines) + '\n'
+
+
+def _text(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, string_types):
+        return value
+    return str(value)
+
+
+def _write_element(lines, tag, value, indent, level):
+    if isinstance(value, list):
+        for item in value:
+            _write_element(lines, tag, item, indent, level)
+        return
+    prefix = indent * level
+    if not isinstance(value, dict):
+        if value is None:
+            lines.append('%s<%s/>' % (prefix, tag))
+        else:
+            lines.append('%s<%s>%s</%s>' % (prefix, tag,
+                                            escape(_text(value)), tag))
+        return
+    attributes = ''.join(' %s=%s' % (key[1:], quoteattr(_text(item)))
+                         for key, item in value.items()
+                         if key.startswith('@') and item is not None)
+    children = [(key, item) for key, item in value.items()
+                if not key.startswith('@') and key != '#text']
+    text = value.get('#text')
+    if not children:
+        if text is None:
+            lines.append('%s<%s%s/>' % (prefix, tag, attributes))
+        else:
+            lines.append('%s<%s%s>%s</%s>' % (prefix, tag, attributes,
+                                              escape(_text(text)), tag))
+        return
+    lines.append('%s<%s%s>' % (prefix, tag, attributes))
+    if text is not None:
+        lines.append('%s%s' % (prefix + indent, escape(_text(text))))
+    for key, item in children:
+        _write_element(lines, key, item, indent, level + 1)
+    lines.append('%s</%s>' % (prefix, tag))
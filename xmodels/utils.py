@@ -13,3 +13,151 @@ class CommonEqualityMixin(object):
 
 
 MsgRecord = namedtuple('MsgRecord', 'path field msg'.split())
+
+
+class _LazyText(object):
+    """Base class of objects rendered to text on first use. Instances compare
+    and hash like their text."""
+    __slots__ = ('_text',)
+
+    def __init__(self):
+        self._text = None
+
+    def _render(self):
+        raise NotImplementedError
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self._render()
+        return self._text
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyText):
+            other = str(other)
+        return str(self) == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __bool__(self):
+        return True
+
+    __nonzero__ = __bool__
+
+
+class Message(_LazyText):
+    """
+    Message text formatted on demand: template % args is only evaluated when
+    the message is converted to a string or compared.
+    """
+    __slots__ = ('template', 'args')
+
+    def __init__(self, template, args=()):
+        super(Message, self).__init__()
+        self.template = template
+        self.args = args
+
+    def _render(self):
+        if isinstance(self.args, tuple) and not self.args:
+            return self.template
+        return self.template % self.args
+
+
+class ModelPath(_LazyText):
+    """
+    Path of a model instance, e.g. Parent.Child[2], stored as reference to
+    the parent path, the class name and the collection index.
+    """
+    __slots__ = ('parent', 'name', 'index')
+
+    def __init__(self, parent, name, index=None):
+        super(ModelPath, self).__init__()
+        self.parent = parent
+        self.name = name
+        self.index = index
+
+    def _render(self):
+        if self.parent and self.name:
+            text = '%s.%s' % (self.parent, self.name)
+        else:
+            text = str(self.parent or self.name or '')
+        if self.index is not None:
+            text = '%s[%d]' % (text, self.index)
+        return text
+
+
+XSI_NS = 'http://www.w3.org/2001/XMLSchema-instance'
+
+
+def clark_name(name_space, local_name):
+    """Returns local_name in Clark notation {name_space}local_name. An
+    attribute prefix @ is kept in front."""
+    if not name_space or local_name.startswith('#'):
+        return local_name
+    if local_name.startswith('@'):
+        return '@{%s}%s' % (name_space, local_name[1:])
+    return '{%s}%s' % (name_space, local_name)
+
+
+def to_clark(data, scope=None):
+    """
+    Returns a copy of data, a dict as created by xmltodict, with all
+    element and attribute names in Clark notation {uri}local. Prefixes are
+    resolved with the @xmlns declarations in scope, the declarations are
+    removed. Unprefixed attributes have no name space. Names already in Clark
+    notation are kept.
+
+    :param dict scope: {prefix: uri} declarations of the enclosing elements,
+        '' for the default name space
+    """
+    result = data.__class__()
+    for key, value in data.items():
+        if key.startswith('@'):
+            if not _is_xmlns(key):
+                result[_clark_key(key, scope)] = value
+        elif isinstance(value, list):
+            items = [_clark_element(item, scope) for item in value]
+            element_scope = items[0][0] if items else scope
+            result[_clark_key(key, element_scope)] = [item for _, item in
+                                                      items]
+        else:
+            element_scope, value = _clark_element(value, scope)
+            result[_clark_key(key, element_scope)] = value
+    return result
+
+
+def _is_xmlns(key):
+    return key.startswith('@xmlns') and key[6:7] in ('', ':')
+
+
+def _clark_element(value, scope):
+    """Returns the scope of an element with content value and the content
+    in Clark notation."""
+    if not isinstance(value, dict):
+        return scope, value
+    declarations = [(key[7:], uri) for key, uri in value.items()
+                    if _is_xmlns(key)]
+    if declarations:
+        scope = dict(scope or {}, **dict(declarations))
+    return scope, to_clark(value, scope)
+
+
+def _clark_key(key, scope):
+    attribute = key.startswith('@')
+    name = key[1:] if attribute else key
+    if name.startswith(('{', '#')):
+        return key
+    prefix, _, local_name = name.rpartition(':')
+    if not prefix and attribute:
+        return key
+    name_space = (scope or {}).get(prefix)
+    if name_space is None:
+        return key
+    return clark_name(name_space, '@' + local_name if attribute
+                      else local_name)